@@ -1,10 +1,24 @@
+import argparse
 import pygame
 import random
 import sys
 from pygame.locals import *
 
+from flappy_engine.capture import FrameCapture
+from flappy_engine.idle import IdleWait
+from flappy_engine.core import Physics
+from flappy_engine.pipes import PipeRing
+from flappy_engine.profiler import (COLLISION, DRAW, EVENTS, FLIP, IDLE, UPDATE,
+                                     FrameProfiler, ProfilerOverlay)
+from flappy_engine.render import DirtyRectRenderer, FullRenderer, compose_background
+from flappy_engine.replay import Replay
+from flappy_engine.sprites import bird_sprite
+from flappy_engine.startup import init
+from flappy_engine.text import render_text
+from flappy_engine.timing import FixedTimestep, ms_to_frames
+
 # Initialize Pygame
-pygame.init()
+init()
 
 # Constants
 WINDOW_WIDTH = 400
@@ -15,6 +29,9 @@ JUMP_SPEED = -7
 PIPE_SPEED = 3
 PIPE_GAP = 150
 PIPE_FREQUENCY = 1600  # milliseconds
+PIPE_INTERVAL = ms_to_frames(PIPE_FREQUENCY, FPS)  # frames
+PIPE_CAPACITY = (WINDOW_WIDTH + 60) // (PIPE_SPEED * (PIPE_INTERVAL + 1)) + 2
+PHYSICS = Physics(GRAVITY, JUMP_SPEED, PIPE_GAP, PIPE_SPEED)
 
 # Colors
 def get_random_light_color():
@@ -33,45 +50,40 @@ class Bird:
         self.reset()
         self.color = get_random_dark_color()
         self.shape = random.choice(['square', 'circle', 'triangle'])
+        self.image, self.mask = bird_sprite(self.shape, self.color)
         
     def reset(self):
         self.x = WINDOW_WIDTH // 4
-        self.y = WINDOW_HEIGHT // 2
+        self.y = self.previous_y = WINDOW_HEIGHT // 2
         self.velocity = 0
         
     def jump(self):
         self.velocity = JUMP_SPEED
         
     def update(self):
+        self.previous_y = self.y
         self.velocity += GRAVITY
         self.y += self.velocity
         
-    def draw(self, surface):
-        if self.shape == 'square':
-            pygame.draw.rect(surface, self.color, (self.x - 15, self.y - 15, 30, 30))
-        elif self.shape == 'circle':
-            pygame.draw.circle(surface, self.color, (self.x, self.y), 15)
-        else:  # triangle
-            points = [
-                (self.x - 15, self.y + 15),
-                (self.x + 15, self.y + 15),
-                (self.x, self.y - 15)
-            ]
-            pygame.draw.polygon(surface, self.color, points)
+    def draw(self, surface, alpha=1.0):
+        # Drawn alpha of the way from the previous step's position to this one's
+        y = self.previous_y + (self.y - self.previous_y) * alpha
+        return surface.blit(self.image, (self.x - 15, y - 15))
             
     def get_mask(self):
-        if self.shape == 'square':
-            return pygame.Rect(self.x - 15, self.y - 15, 30, 30)
-        elif self.shape == 'circle':
-            return pygame.Rect(self.x - 15, self.y - 15, 30, 30)  # Simplified collision
-        else:
-            return pygame.Rect(self.x - 15, self.y - 15, 30, 30)  # Simplified collision
+        # Bounding rect for the cheap reject; self.mask has the exact pixels
+        return pygame.Rect(self.x - 15, self.y - 15, 30, 30)
 
 class Pipe:
-    def __init__(self, x):
+    __slots__ = ('x', 'height', 'color', 'passed')
+    
+    def __init__(self, x, rng=random):
+        self.reset(x, rng)
+        
+    def reset(self, x, rng=random):
         self.x = x
-        self.height = random.randint(150, 400)
-        self.color = random.choice([
+        self.height = rng.randint(150, 400)
+        self.color = rng.choice([
             (0, 100, 0),  # Dark green
             (139, 69, 19),  # Brown
             (64, 64, 64)   # Dark gray
@@ -81,33 +93,83 @@ class Pipe:
     def update(self):
         self.x -= PIPE_SPEED
         
-    def draw(self, surface):
+    def draw(self, surface, alpha=1.0):
+        x = self.x + PIPE_SPEED * (1 - alpha)
         # Bottom pipe
-        pygame.draw.rect(surface, self.color,
-                        (self.x - 30, self.height, 60, WINDOW_HEIGHT - self.height))
+        bottom = pygame.draw.rect(surface, self.color,
+                                  (x - 30, self.height, 60, WINDOW_HEIGHT - self.height))
         # Top pipe
-        pygame.draw.rect(surface, self.color,
-                        (self.x - 30, 0, 60, self.height - PIPE_GAP))
+        top = pygame.draw.rect(surface, self.color,
+                               (x - 30, 0, 60, self.height - PIPE_GAP))
+        return bottom, top
         
-    def collides_with(self, bird_mask):
-        pipe_rects = [
-            pygame.Rect(self.x - 30, 0, 60, self.height - PIPE_GAP),
-            pygame.Rect(self.x - 30, self.height, 60, WINDOW_HEIGHT - self.height)
-        ]
-        return any(pipe_rect.colliderect(bird_mask) for pipe_rect in pipe_rects)
+    def collides_with(self, bird):
+        bird_rect = bird.get_mask()
+        top_rect = pygame.Rect(self.x - 30, 0, 60, self.height - PIPE_GAP)
+        bottom_rect = pygame.Rect(self.x - 30, self.height, 60, WINDOW_HEIGHT - self.height)
+        # PIPE_MASK is aligned to the bottom edge of the top pipe and the top
+        # edge of the bottom one; rects are only overlapped when the boxes touch
+        if top_rect.colliderect(bird_rect):
+            offset = (top_rect.x - bird_rect.x, top_rect.bottom - WINDOW_HEIGHT - bird_rect.y)
+            if bird.mask.overlap(PIPE_MASK, offset):
+                return True
+        if bottom_rect.colliderect(bird_rect):
+            offset = (bottom_rect.x - bird_rect.x, bottom_rect.y - bird_rect.y)
+            if bird.mask.overlap(PIPE_MASK, offset):
+                return True
+        return False
+
+# Solid mask as tall as the window, shared by every pipe
+PIPE_MASK = pygame.mask.Mask((60, WINDOW_HEIGHT), fill=True)
 
-def main():
+def make_background(background_color, ground_color):
+    return compose_background((WINDOW_WIDTH, WINDOW_HEIGHT), background_color, ground_color, 50)
+
+def main(seed=None, speed=1.0, dirty=False, record=None, capture=None, profiler=None,
+         max_fps=FPS):
+    # Pipes come from their own seeded generator so a seed always gives the
+    # same course; the cosmetic colors keep using the global random module.
+    # Each restart moves on to the next seed so every game can be replayed.
+    if seed is not None:
+        random.seed(seed)
+    else:
+        seed = random.randrange(2 ** 32)
+    game_seed = seed
+    rng = random.Random(game_seed)
+    timestep = FixedTimestep(FPS, speed)
     bird = Bird()
-    pipes = []
+    replay = Replay(game_seed, bird.shape, PHYSICS)
+    flapped = False
+    pipes = PipeRing(PIPE_CAPACITY, Pipe)
     score = 0
     best_score = 0
-    last_pipe = pygame.time.get_ticks()
+    frame = 0
+    last_pipe = frame
     game_active = True
     background_color = (173, 216, 230)  # Light blue
     ground_color = random.choice([(139, 69, 19), (218, 165, 32)])  # Dark brown or golden yellow
     
+    # Sky and ground are composited once and only the playfield above the
+    # ground is drawn on; dirty mode also pushes just the changed regions.
+    renderer_class = DirtyRectRenderer if dirty else FullRenderer
+    renderer = renderer_class(screen, (0, 0, WINDOW_WIDTH, WINDOW_HEIGHT - 50))
+    renderer.set_background(make_background(background_color, ground_color))
+    
     font = pygame.font.Font(None, 36)
     
+    # F3 shows per-phase frame timings; recording only runs while they are
+    # shown or when --profile asked for them
+    if profiler is None:
+        profiler = FrameProfiler(FPS)
+    profiling = profiler.enabled
+    overlay = None
+    mark = profiler.mark
+    frame_ms = 1000 / FPS
+    
+    # The game-over screen and an unfocused window wait for input instead
+    # of redrawing the same frame
+    idle = IdleWait(clock)
+    
     while True:
         for event in pygame.event.get():
             if event.type == QUIT:
@@ -118,79 +180,157 @@ def main():
                 if event.key in (K_ESCAPE, K_q):
                     pygame.quit()
                     sys.exit()
+                if event.key == K_F3:
+                    if overlay:
+                        overlay = None
+                        profiler.enabled = profiling
+                    else:
+                        overlay = ProfilerOverlay(profiler, pygame.font.Font(None, 20))
+                        profiler.enabled = True
+                    mark = profiler.mark
                 if event.key == K_SPACE:
                     if game_active:
                         bird.jump()
+                        flapped = True
                     else:
                         # Reset game
                         bird.reset()
+                        game_seed += 1
+                        rng = random.Random(game_seed)
+                        replay = Replay(game_seed, bird.shape, PHYSICS)
+                        flapped = False
                         pipes.clear()
                         score = 0
-                        last_pipe = pygame.time.get_ticks()
+                        last_pipe = frame
                         game_active = True
                         background_color = get_random_light_color()
                         ground_color = random.choice([(139, 69, 19), (218, 165, 32)])
+                        renderer.set_background(make_background(background_color, ground_color))
         
-        screen.fill(background_color)
+        mark(EVENTS)
         
-        if game_active:
+        # Physics runs in fixed steps however fast frames are drawn: run as
+        # many as the time since the last frame calls for
+        steps = timestep.advance(frame_ms)
+        for _ in range(steps):
+            if not game_active:
+                break
+            
             # Update bird
+            replay.record(flapped)
+            flapped = False
             bird.update()
+            frame += 1
             
             # Generate pipes
-            current_time = pygame.time.get_ticks()
-            if current_time - last_pipe > PIPE_FREQUENCY:
-                pipes.append(Pipe(WINDOW_WIDTH + 30))
-                last_pipe = current_time
+            if frame - last_pipe > PIPE_INTERVAL:
+                pipes.spawn(WINDOW_WIDTH + 30, rng)
+                last_pipe = frame
             
-            # Update and draw pipes
-            for pipe in pipes[:]:
+            # Update pipes; only the oldest can have scrolled off
+            for pipe in pipes:
                 pipe.update()
-                pipe.draw(screen)
-                
-                if pipe.x < -30:
-                    pipes.remove(pipe)
-                    continue
-                
-                if pipe.x < bird.x and not pipe.passed:
-                    score += 1
-                    pipe.passed = True
-                
-                if pipe.collides_with(bird.get_mask()):
+            if pipes and pipes[0].x < -30:
+                pipes.expire()
+            
+            # Score off the pipe cursor, then collide only with nearby pipes
+            score += pipes.advance(bird.x)
+            
+            mark(UPDATE)
+            bird_rect = bird.get_mask()
+            for pipe in pipes.overlapping(bird_rect.left, bird_rect.right, 30):
+                if pipe.collides_with(bird):
                     game_active = False
                     best_score = max(score, best_score)
+                    break
+            mark(COLLISION)
             
             # Check ground/ceiling collision
             if bird.y < 0 or bird.y > WINDOW_HEIGHT - 50:
                 game_active = False
                 best_score = max(score, best_score)
             
-            bird.draw(screen)
+            # Keep the replay of the best game of the session
+            if not game_active:
+                replay.score = score
+                if record and score == best_score:
+                    replay.save(record)
+        mark(UPDATE)
+        
+        renderer.begin()
+        
+        if game_active:
+            # Draw between the last two steps so motion stays smooth when
+            # frames and steps don't line up
+            alpha = timestep.alpha
+            for pipe in pipes:
+                renderer.mark(*pipe.draw(screen, alpha))
+            
+            renderer.mark(bird.draw(screen, alpha))
             
             # Draw score
-            score_text = font.render(f'Score: {score}', True, (0, 0, 0))
-            screen.blit(score_text, (WINDOW_WIDTH - 120, 10))
+            score_text = render_text(font, f'Score: {score}', True, (0, 0, 0))
+            renderer.mark(screen.blit(score_text, (WINDOW_WIDTH - 120, 10)))
         else:
             # Game over screen
-            game_over_text = font.render('Game Over!', True, (0, 0, 0))
-            score_text = font.render(f'Best Score: {best_score}', True, (0, 0, 0))
-            restart_text = font.render('Press SPACE to restart', True, (0, 0, 0))
+            game_over_text = render_text(font, 'Game Over!', True, (0, 0, 0))
+            score_text = render_text(font, f'Best Score: {best_score}', True, (0, 0, 0))
+            restart_text = render_text(font, 'Press SPACE to restart', True, (0, 0, 0))
             
-            screen.blit(game_over_text, 
-                       (WINDOW_WIDTH // 2 - game_over_text.get_width() // 2, 
-                        WINDOW_HEIGHT // 2 - 60))
-            screen.blit(score_text,
-                       (WINDOW_WIDTH // 2 - score_text.get_width() // 2,
-                        WINDOW_HEIGHT // 2))
-            screen.blit(restart_text,
-                       (WINDOW_WIDTH // 2 - restart_text.get_width() // 2,
-                        WINDOW_HEIGHT // 2 + 60))
+            renderer.mark(
+                screen.blit(game_over_text, 
+                           (WINDOW_WIDTH // 2 - game_over_text.get_width() // 2, 
+                            WINDOW_HEIGHT // 2 - 60)),
+                screen.blit(score_text,
+                           (WINDOW_WIDTH // 2 - score_text.get_width() // 2,
+                            WINDOW_HEIGHT // 2)),
+                screen.blit(restart_text,
+                           (WINDOW_WIDTH // 2 - restart_text.get_width() // 2,
+                            WINDOW_HEIGHT // 2 + 60)))
         
-        # Draw ground
-        pygame.draw.rect(screen, ground_color, (0, WINDOW_HEIGHT - 50, WINDOW_WIDTH, 50))
+        if overlay:
+            renderer.mark(overlay.draw(screen))
+        mark(DRAW)
         
-        pygame.display.flip()
-        clock.tick(FPS)
+        renderer.present()
+        if capture:
+            capture.grab(screen)
+        mark(FLIP)
+        frame_ms = clock.tick(max_fps)
+        idle(not game_active and not overlay)
+        mark(IDLE)
+        profiler.end_frame()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seed', type=int, help='replay the same pipe course every run')
+    parser.add_argument('--speed', type=float, default=1.0, help='game speed multiplier')
+    parser.add_argument('--dirty', action='store_true',
+                        help='redraw and push only the changed screen regions')
+    parser.add_argument('--record', metavar='FILE', help='save a replay of the best game')
+    parser.add_argument('--capture', metavar='FILE',
+                        help="stream raw frames to FILE, or to stdout for '-'")
+    parser.add_argument('--capture-seconds', type=int, default=60,
+                        help='length of the preallocated capture file')
+    parser.add_argument('--max-fps', type=int, default=FPS,
+                        help='cap on frames drawn per second, 0 for none; '
+                             'physics always runs at %d steps per second' % FPS)
+    parser.add_argument('--profile', metavar='FILE',
+                        help='time every frame phase and save the last 600 frames '
+                             'to FILE (.csv or .json) on exit')
+    args = parser.parse_args()
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture, screen, FPS, args.capture_seconds * FPS)
+    profiler = FrameProfiler(FPS, enabled=bool(args.profile))
+    try:
+        # Captured video plays back at FPS
+        max_fps = FPS if capture else args.max_fps
+        main(args.seed, args.speed, args.dirty, args.record, capture, profiler, max_fps)
+    finally:
+        if args.profile:
+            profiler.dump(args.profile)
+        if capture:
+            capture.close()
+            print('capture: {written} frames written, {dropped} dropped'.format(
+                **capture.stats()), file=sys.stderr)
\ No newline at end of file
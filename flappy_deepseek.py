@@ -1,18 +1,27 @@
+import argparse
 import pygame
 import random
 import sys
 
+from flappy_engine.idle import IdleWait
+from flappy_engine.pipes import PipeRing
+from flappy_engine.startup import init, sys_font
+from flappy_engine.text import render_text
+from flappy_engine.timing import FixedTimestep, ms_to_frames
+
 # Initialize Pygame
-pygame.init()
+init()
 
 # Game constants
 SCREEN_WIDTH = 400
 SCREEN_HEIGHT = 600
+FPS = 60
 GRAVITY = 0.5
 JUMP_FORCE = -10
 PIPE_SPEED = -3
 PIPE_GAP = 150
 PIPE_FREQ = 1500
+PIPE_INTERVAL = ms_to_frames(PIPE_FREQ)  # frames between pipes
 LAND_HEIGHT = 50
 
 # Color definitions
@@ -67,12 +76,17 @@ class Bird:
         return pygame.Rect(self.x - self.size//2, self.y - self.size//2, self.size, self.size)
 
 class Pipe:
-    def __init__(self, x):
+    __slots__ = ('x', 'width', 'gap_height', 'bottom_y', 'color', 'passed')
+    
+    def __init__(self, x, rng=random):
+        self.reset(x, rng)
+    
+    def reset(self, x, rng=random):
         self.x = x
         self.width = 60
-        self.gap_height = random.randint(100, SCREEN_HEIGHT - PIPE_GAP - 100)
+        self.gap_height = rng.randint(100, SCREEN_HEIGHT - PIPE_GAP - 100)
         self.bottom_y = self.gap_height + PIPE_GAP
-        self.color = random.choice([DARK_GREEN, LIGHT_BROWN, DARK_GRAY])
+        self.color = rng.choice([DARK_GREEN, LIGHT_BROWN, DARK_GRAY])
         self.passed = False
     
     def update(self):
@@ -86,11 +100,23 @@ class Pipe:
         return (pygame.Rect(self.x, 0, self.width, self.gap_height),
                 pygame.Rect(self.x, self.bottom_y, self.width, SCREEN_HEIGHT - self.bottom_y))
 
-def main():
+def main(seed=None, speed=1.0):
+    # Pipes come from their own seeded generator so a seed always gives the
+    # same course; the cosmetic colors keep using the global random module.
+    # Each game moves on to the next seed so every game can be replayed.
+    if seed is not None:
+        random.seed(seed)
+    else:
+        seed = random.randrange(2 ** 32)
+    game_seed = seed
+    rng = random.Random(game_seed)
+    timestep = FixedTimestep(FPS, speed)
+    # Measured by clock.tick() at the end of every frame
+    frame_ms = 1000 / FPS
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Flappy Bird")
     clock = pygame.time.Clock()
-    font = pygame.font.SysFont(None, 36)
+    font = sys_font(None, 36)
     best_score = 0
 
     # Game state variables
@@ -99,12 +125,14 @@ def main():
     background_color = random_light_color()
     land_color = random.choice([DARK_BROWN, DARK_YELLOW])
     bird = Bird()
-    pipes = []
-    last_pipe_time = pygame.time.get_ticks()
+    pipes = PipeRing(4, Pipe)
+    frame = 0
+    last_pipe = frame
+    idle = IdleWait(clock)
 
     running = True
     while running:
-        current_time = pygame.time.get_ticks()
+        idle(not game_active)
         
         # Event handling
         for event in pygame.event.get():
@@ -114,24 +142,35 @@ def main():
                 if event.key == pygame.K_SPACE and game_active:
                     bird.jump()
                 elif event.key == pygame.K_SPACE and not game_active:
-                    # Reset game
+                    # Reset game; the first one plays the course main() seeded
                     game_active = True
+                    if frame:
+                        game_seed += 1
+                        # Reseeded in place: a new Random is 2.5 KB to allocate
+                        rng.seed(game_seed)
                     bird = Bird()
-                    pipes = []
+                    pipes.clear()
+                    last_pipe = frame
                     score = 0
                     background_color = random_light_color()
                     land_color = random.choice([DARK_BROWN, DARK_YELLOW])
                 if event.key in (pygame.K_q, pygame.K_ESCAPE):
                     running = False
         
-        if game_active:
+        # Physics runs in fixed steps, as many as the time since the last
+        # frame calls for, so --speed fast-forwards the same course. The
+        # steps are counted down rather than iterated over a new range()
+        steps = timestep.advance(frame_ms)
+        while steps and game_active:
+            steps -= 1
             # Update bird
             bird.update()
+            frame += 1
 
             # Generate new pipes
-            if current_time - last_pipe_time > PIPE_FREQ:
-                pipes.append(Pipe(SCREEN_WIDTH))
-                last_pipe_time = current_time
+            if frame - last_pipe > PIPE_INTERVAL:
+                pipes.spawn(SCREEN_WIDTH, rng)
+                last_pipe = frame
             
             # Update pipes and check scoring
             for pipe in pipes:
@@ -141,8 +180,9 @@ def main():
                     score += 1
                     best_score = max(score, best_score)
             
-            # Remove off-screen pipes
-            pipes = [pipe for pipe in pipes if pipe.x > -pipe.width]
+            # Remove off-screen pipes, oldest first
+            while pipes and pipes[0].x <= -pipes[0].width:
+                pipes.expire()
 
             # Collision detection
             bird_rect = bird.get_rect()
@@ -171,23 +211,27 @@ def main():
             bird.draw(screen)
         else:
             # Game over text
-            game_over_text = font.render("Game Over", True, BLACK)
-            score_text = font.render(f"Score: {score}", True, BLACK)
-            best_text = font.render(f"Best: {best_score}", True, BLACK)
+            game_over_text = render_text(font, "Game Over", True, BLACK)
+            score_text = render_text(font, f"Score: {score}", True, BLACK)
+            best_text = render_text(font, f"Best: {best_score}", True, BLACK)
             screen.blit(game_over_text, (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
             screen.blit(score_text, (SCREEN_WIDTH//2 - score_text.get_width()//2, SCREEN_HEIGHT//2))
             screen.blit(best_text, (SCREEN_WIDTH//2 - best_text.get_width()//2, SCREEN_HEIGHT//2 + 50))
         
         # Draw land and score
         pygame.draw.rect(screen, land_color, (0, SCREEN_HEIGHT - LAND_HEIGHT, SCREEN_WIDTH, LAND_HEIGHT))
-        score_surface = font.render(str(score), True, BLACK)
+        score_surface = render_text(font, str(score), True, BLACK)
         screen.blit(score_surface, (SCREEN_WIDTH - 50, 10))
         
         pygame.display.update()
-        clock.tick(60)
+        frame_ms = clock.tick(FPS)
 
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seed', type=int, help='replay the same pipe course every run')
+    parser.add_argument('--speed', type=float, default=1.0, help='game speed multiplier')
+    args = parser.parse_args()
+    main(args.seed, args.speed)
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""Display-free Flappy Bird engine shared by the LLM implementations."""
+from .core import Bird, Game, Pipe, Rules
+from .timing import FixedTimestep
+
+__all__ = ['Bird', 'FixedTimestep', 'Game', 'Pipe', 'Rules']
@@ -0,0 +1,256 @@
+"""Per-frame allocation budgets for every implementation in the repository.
+
+Each variant runs in its own subprocess under the same hooks as bench.py, with
+tracemalloc started once the first frame is on screen. For every frame it
+records, separately for the update and draw phases:
+
+  allocated  the most memory the phase had allocated at once beyond what was
+             live when it started, so short-lived objects count too
+  retained   how much more memory is live at the end of the phase than at the
+             start
+
+Small objects the interpreter recycles from its free lists (floats, short
+tuples) don't reach the allocator and aren't seen, but they also never
+trigger a garbage collection. Collections during the run are counted too,
+starting from a full collection at the end of the warm-up.
+
+The first WARMUP_FRAMES frames fill caches (rendered text, pipe rings) and
+are not counted. Over the rest the means per frame are compared with
+BUDGETS and RETAINED_BUDGET, collections with GC_BUDGET, and the run exits
+with status 1 if anything is over.
+
+Usage:
+    python -m flappy_engine.allocations [--frames N] [--output results.json]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+from array import array
+
+from .bench import FLAP_PERIOD, REPO_ROOT, VARIANTS, run_child, run_variant
+
+WARMUP_FRAMES = 300
+PHASES = ('update', 'draw')
+
+# Mean bytes allocated per frame in each phase, about half as much again as
+# measured (Python 3.11, pygame 2.6); lower them as the hot paths get leaner.
+# Draw includes the harness's own copy of the frame to the display, and
+# gemini-flash, which crashes on start, has the loosest of the others'.
+BUDGETS = {
+    'flappy_claude3.5.py': {'update': 448, 'draw': 288},
+    'flappy_deepseek.py': {'update': 192, 'draw': 288},
+    'flappy_gemini2.0flash.py': {'update': 448, 'draw': 288},
+    'flappy_gemini2.0flash_thinking.py': {'update': 256, 'draw': 288},
+    'flappy_mistral.py': {'update': 128, 'draw': 288},
+    'flappy_o3mini.py': {'update': 192, 'draw': 288},
+    'engine': {'update': 96, 'draw': 0},
+}
+# Mean bytes per frame a phase may leave live; more than this is growth
+RETAINED_BUDGET = 16
+# Garbage collections per thousand frames, of any generation
+GC_BUDGET = 1
+
+
+class AllocationRecorder:
+    """Collects per-phase allocations from the hooks installed by bench.run_variant().
+
+    Samples go into flat integer arrays, so recording them creates no
+    objects for the garbage collector to count.
+    """
+
+    def __init__(self, frames, warmup=WARMUP_FRAMES):
+        self.frames = frames
+        self.warmup = warmup
+        self.samples = {(phase, kind): array('q') for phase in PHASES
+                        for kind in ('allocated', 'retained')}
+        self.started = False
+        self.drawing = False
+        self.mark = 0
+        self.collections = None
+
+    def _begin(self):
+        # The first call leaves a tuple on the interpreter's free list for
+        # the second to reuse, so the reading tuple isn't counted as retained
+        tracemalloc.get_traced_memory()
+        self.mark = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def _end(self, phase):
+        current, peak = tracemalloc.get_traced_memory()
+        self.samples[phase, 'allocated'].append(peak - self.mark)
+        self.samples[phase, 'retained'].append(current - self.mark)
+
+    def start_draw(self):
+        if self.started and not self.drawing:
+            self._end('update')
+            self.drawing = True
+            self._begin()
+
+    def end_frame(self):
+        if not self.started:
+            tracemalloc.start()
+            self.started = True
+        else:
+            if self.drawing:
+                self._end('draw')
+            else:
+                self._end('update')
+                self.samples['draw', 'allocated'].append(0)
+                self.samples['draw', 'retained'].append(0)
+            if self.recorded == self.warmup:
+                # Start from empty generations, so whether a collection falls
+                # in the run depends on what the frames allocate and not on
+                # what startup left behind
+                gc.collect()
+                self.collections = _collections()
+        self.drawing = False
+        self._begin()
+
+    def timed(self, func):
+        # Collision helpers are part of the update phase here
+        return func
+
+    @property
+    def recorded(self):
+        return len(self.samples['draw', 'allocated'])
+
+    @property
+    def done(self):
+        return self.recorded >= self.warmup + self.frames
+
+    def result(self):
+        frames = self.recorded - self.warmup
+        if frames <= 0:
+            return {}
+        result = {'frames': frames}
+        for phase in PHASES:
+            result[phase] = summarize(self.samples[phase, 'allocated'][self.warmup:],
+                                      self.samples[phase, 'retained'][self.warmup:])
+        result['gc_per_1000_frames'] = round(
+            (_collections() - self.collections) * 1000 / frames, 2)
+        return result
+
+
+def _collections():
+    return sum(stats['collections'] for stats in gc.get_stats())
+
+
+def summarize(allocated, retained):
+    """Mean and worst bytes allocated, and mean bytes retained, per frame."""
+    return {
+        'allocated_b': round(sum(allocated) / len(allocated), 1),
+        'allocated_max_b': max(allocated),
+        'retained_b': round(sum(retained) / len(retained), 2),
+    }
+
+
+def drive_engine(frames):
+    """The headless engine, for comparison: update only, no draw."""
+    from .core import Game
+
+    game = Game(random.Random(0))
+    recorder = AllocationRecorder(frames)
+    frame = 0
+    while True:
+        recorder.end_frame()
+        if recorder.done:
+            break
+        if not game.step(frame % FLAP_PERIOD == 0):
+            game.reset()
+        frame += 1
+    tracemalloc.stop()
+    return recorder.result()
+
+
+def drive(path, frames):
+    """Run one variant in this process and return its allocations."""
+    recorder = AllocationRecorder(frames)
+    run = run_variant(path, recorder)
+    tracemalloc.stop()
+    result = recorder.result()
+    if 'error' in run:
+        result['error'] = run['error']
+    return result
+
+
+def over_budget(target, result):
+    """Phases of result that allocate or retain more than target's budget."""
+    budget = BUDGETS.get(target, {})
+    over = []
+    for phase in PHASES:
+        stats = result.get(phase)
+        if stats is None:
+            continue
+        if stats['allocated_b'] > budget.get(phase, 0):
+            over.append(f"{phase} allocates {stats['allocated_b']:.0f} B/frame "
+                        f"(budget {budget.get(phase, 0)})")
+        if stats['retained_b'] > RETAINED_BUDGET:
+            over.append(f"{phase} retains {stats['retained_b']:.1f} B/frame "
+                        f"(budget {RETAINED_BUDGET})")
+    if result.get('gc_per_1000_frames', 0) > GC_BUDGET:
+        over.append(f"{result['gc_per_1000_frames']} collections per 1000 frames "
+                    f"(budget {GC_BUDGET})")
+    return over
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=1000,
+                        help='frames measured after the warm-up')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--only', nargs='*', help='variant files (or "engine") to run')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        if args.child == 'engine':
+            result = drive_engine(args.frames)
+        else:
+            result = drive(os.path.join(REPO_ROOT, args.child), args.frames)
+        print(json.dumps(result))
+        return
+
+    targets = args.only or VARIANTS + ['engine']
+    results = {
+        'frames': args.frames,
+        'warmup_frames': WARMUP_FRAMES,
+        'python': sys.version.split()[0],
+        'retained_budget_b': RETAINED_BUDGET,
+        'gc_budget_per_1000_frames': GC_BUDGET,
+        'variants': {},
+    }
+    failures = 0
+    for target in targets:
+        result = run_child(target, args.frames, 'flappy_engine.allocations')
+        result.pop('startup_ms', None)
+        results['variants'][target] = result
+        if 'update' not in result:
+            # A variant that can't run has nothing to hold to a budget
+            print(f"{target:36s} {result.get('error')}", file=sys.stderr)
+            continue
+        over = over_budget(target, result)
+        result['budget'] = BUDGETS.get(target)
+        result['over_budget'] = over
+        failures += bool(over)
+        print(f"{target:36s} update {result['update']['allocated_b']:>8.0f} B  "
+              f"draw {result['draw']['allocated_b']:>8.0f} B  "
+              f"gc {result['gc_per_1000_frames']:>6.2f}/1000"
+              + (''.join(f'\n    over budget: {line}' for line in over)),
+              file=sys.stderr)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
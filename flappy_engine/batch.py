@@ -0,0 +1,123 @@
+"""Batched simulation of many birds against one shared pipe course.
+
+Bird state is held struct-of-arrays style in NumPy so that a frame for every
+bird is a handful of vectorized operations. The course does not depend on the
+birds, so it is generated once per frame exactly as core.Game would generate it
+from the same rng, and each bird ends with the same score, frame count and
+death cause it would get from a scalar Game fed the same actions.
+"""
+import random
+
+import numpy as np
+
+from .core import RULES, Pipe, check_course, scroll, spawn_pipe
+from .pipes import PipeRing
+
+# Values of BatchGame.death_cause
+ALIVE, PIPE, CEILING, GROUND = 0, 1, 2, 3
+DEATH_CAUSES = (None, 'pipe', 'ceiling', 'ground')
+
+
+class BatchGame:
+    """N independent birds of one shape flying through the same course."""
+
+    def __init__(self, n, rng=random, shape='square', physics=None, course=None, rules=RULES):
+        self.n = n
+        self.rng = rng
+        self.rules = rules
+        self.physics = physics = physics or rules.physics
+        check_course(course, rules, physics)
+        self.course = course
+        self.offset, self.size, self.extents = rules.hitbox(shape)
+        self.y = np.empty(n)
+        self.velocity = np.empty(n)
+        self.alive = np.empty(n, dtype=bool)
+        self.score = np.empty(n, dtype=np.int64)
+        self.frames = np.empty(n, dtype=np.int64)
+        self.death_cause = np.empty(n, dtype=np.int8)
+        # The course is the same PipeRing of Pipe records a Game has, moved
+        # by core.scroll, so every rules plugin spawns and scores identically
+        self.pipes = PipeRing(rules.pipe_capacity(physics.pipe_speed), Pipe)
+        self.pipe_shift = rules.pipe_offset + rules.pipe_width // 2
+        # Scratch buffers reused every frame
+        self._top = np.empty(n)
+        self._hit = np.empty(n, dtype=bool)
+        self._tmp = np.empty(n, dtype=bool)
+        self.reset()
+
+    def reset(self):
+        self.y.fill(self.rules.bird_y)
+        self.velocity.fill(0)
+        self.alive.fill(True)
+        self.score.fill(0)
+        self.frames.fill(0)
+        self.death_cause.fill(ALIVE)
+        self.pipes.clear()
+        self.frame = 0
+        self.last_pipe = 0
+        if self.course is not None:
+            self.course.reset()
+        self.pipe_interval = self.rules.next_interval(self.rng)
+        for _ in range(self.rules.initial_pipes):
+            spawn_pipe(self)
+
+    def step(self, actions):
+        """Advance every live bird one frame; actions[i] flaps bird i.
+
+        Returns whether any bird is still alive.
+        """
+        rules = self.rules
+        gravity, jump_speed, pipe_gap, pipe_speed = self.physics
+        alive = self.alive
+        flap = np.logical_and(actions, alive, out=self._tmp)
+        self.velocity[flap] = rules.jump(self.velocity[flap], jump_speed)
+        np.add(self.velocity, gravity, out=self.velocity, where=alive)
+        np.add(self.y, self.velocity, out=self.y, where=alive)
+        if rules.clamp_ceiling:
+            np.less(self.y, 0, out=self._tmp)
+            self.y[self._tmp] = 0
+            self.velocity[self._tmp] = 0
+        self.frame += 1
+        self.frames[alive] = self.frame
+
+        # Pipes pass every bird on the same frame
+        passed = scroll(self)
+        if passed:
+            self.score[alive] += passed
+
+        hit = self._hit
+        hit.fill(False)
+        if self.pipes.count:
+            top = np.add(self.y, self.offset, out=self._top)
+            if rules.truncate:
+                # int() truncation of the bird rect, as in Bird.get_rect
+                np.trunc(top, out=top)
+            size = self.size
+            width = rules.pipe_width
+            bird_left = rules.bird_x + self.offset
+            left = bird_left - self.pipe_shift
+            for pipe in self.pipes.overlapping(left, left + size, width // 2):
+                pipe_left = pipe.x + rules.pipe_offset
+                # Birds share x, so the mask rows a pipe can touch are the same
+                # for all of them and the exact test is two thresholds on y
+                extent = self.extents[pipe_left - bird_left + width - 1]
+                if extent is None:
+                    continue
+                first, last = extent
+                height = pipe.height
+                hit |= (top > height - last - 1) & (top < rules.pipe_bottom)
+                if height - pipe_gap > 0:
+                    hit |= (top < height - pipe_gap - first) & (top > -size)
+
+        # Pipe deaths take precedence over ceiling and ground, as in Game._end
+        cause = self.death_cause
+        np.logical_and(hit, alive, out=self._tmp)
+        cause[self._tmp] = PIPE
+        np.logical_and(self.y < 0, alive, out=self._tmp)
+        self._tmp &= ~hit
+        cause[self._tmp] = CEILING
+        np.logical_and(rules.grounded(self.y), alive, out=self._tmp)
+        self._tmp &= ~hit
+        cause[self._tmp] = GROUND
+        np.equal(cause, ALIVE, out=alive)
+        return bool(alive.any())
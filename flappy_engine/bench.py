@@ -0,0 +1,351 @@
+"""Per-frame cost benchmark for every implementation in the repository.
+
+Each variant runs in its own subprocess under SDL's dummy video driver with the
+frame pacing calls (Clock.tick, pygame.time.delay, time.sleep) and idle waits
+(pygame.event.wait) turned into no-ops and the keyboard replaced by a scripted
+SPACE press. Most variants run
+their game loop at import time, so instead of importing them the runner hooks
+into pygame and measures each frame from the outside:
+
+  draw       from the first screen.fill() or screen.blit() to the return of
+             the display flip/update
+  collision  time spent in the variant's collision helpers, where it has any
+  update     everything else in the frame (events, physics, pipes, scoring)
+
+Start-up is timed from launching the subprocess to the first frame reaching
+the display, so it includes the interpreter, imports and pygame set-up. It is
+checked against STARTUP_TARGET_MS.
+
+Usage:
+    python -m flappy_engine.bench [--frames N] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import runpy
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VARIANTS = [
+    'flappy_claude3.5.py',
+    'flappy_deepseek.py',
+    'flappy_gemini2.0flash.py',
+    'flappy_gemini2.0flash_thinking.py',
+    'flappy_mistral.py',
+    'flappy_o3mini.py',
+]
+
+# Functions and methods timed as the collision phase. o3mini and gemini-flash
+# test collisions inline in the loop, so for them it stays part of update.
+COLLISION_HOOKS = {
+    'flappy_claude3.5.py': ['Pipe.collides_with', 'Bird.get_mask'],
+    'flappy_deepseek.py': ['Pipe.get_rects', 'Bird.get_rect'],
+    'flappy_gemini2.0flash.py': [],
+    'flappy_gemini2.0flash_thinking.py': ['check_collision'],
+    'flappy_mistral.py': ['check_collision'],
+    'flappy_o3mini.py': [],
+}
+
+FLAP_PERIOD = 20  # frames between scripted SPACE presses
+
+# Launch to first presented frame; kiosks relaunch the game after every session
+STARTUP_TARGET_MS = 500
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    """p50/p99/mean of a list of seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 4),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 4),
+    }
+
+
+class FrameRecorder:
+    """Collects per-phase timings from the pygame hooks installed by drive()."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.frame_start = None
+        self.draw_start = None
+        self.collision = 0.0
+        self.totals = []
+        self.draws = []
+        self.collisions = []
+
+    def start_draw(self):
+        if self.draw_start is None:
+            self.draw_start = time.perf_counter()
+
+    def end_frame(self):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            draw_start = self.draw_start if self.draw_start is not None else now
+            self.totals.append(now - self.frame_start)
+            self.draws.append(now - draw_start)
+            self.collisions.append(self.collision)
+        self.frame_start = now
+        self.draw_start = None
+        self.collision = 0.0
+
+    def timed(self, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.collision += time.perf_counter() - start
+        return wrapper
+
+    @property
+    def done(self):
+        return len(self.totals) >= self.frames
+
+
+def run_variant(path, recorder):
+    """Run one variant in this process with recorder hooked into its frames.
+
+    recorder is told where each frame's draw phase starts and where the frame
+    ends, and wraps the collision helpers; it stops the game once done.
+    Returns a dict with the error the variant died of, if any, the wall time
+    of the run and when its first frame was presented.
+    """
+    import pygame
+
+    hooks = COLLISION_HOOKS.get(os.path.basename(path), [])
+    state = {'frame': 0, 'hooked': False, 'first_frame': None}
+
+    class TimedSurface(pygame.Surface):
+        # The variant draws into this surface. Frames start with a fill(),
+        # or with a blit() of a prepared background, marking the start of draw.
+        def fill(self, *args, **kwargs):
+            recorder.start_draw()
+            return super().fill(*args, **kwargs)
+
+        def blit(self, *args, **kwargs):
+            recorder.start_draw()
+            return super().blit(*args, **kwargs)
+
+    real_set_mode = pygame.display.set_mode
+    real_flip = pygame.display.flip
+    real_update = pygame.display.update
+    real_get = pygame.event.get
+    display = {}
+
+    def set_mode(size, *args, **kwargs):
+        display['real'] = real_set_mode(size, *args, **kwargs)
+        display['proxy'] = TimedSurface(size).convert()
+        return display['proxy']
+
+    def present(real):
+        def wrapper(*args, **kwargs):
+            recorder.start_draw()
+            display['real'].blit(display['proxy'], (0, 0))
+            result = real(*args, **kwargs)
+            if state['first_frame'] is None:
+                # Wall-clock time, compared with the parent's launch time
+                state['first_frame'] = time.time()
+            recorder.end_frame()
+            return result
+        return wrapper
+
+    def install_collision_hooks(namespace):
+        for name in hooks:
+            owner_name, _, attr = name.rpartition('.')
+            owner = namespace[owner_name] if owner_name else namespace
+            if owner_name:
+                setattr(owner, attr, recorder.timed(getattr(owner, attr)))
+            else:
+                owner[attr] = recorder.timed(owner[attr])
+
+    def get_events(*args, **kwargs):
+        if not state['hooked']:
+            # The variant's globals exist by the time it first polls events
+            install_collision_hooks(sys._getframe(1).f_globals)
+            state['hooked'] = True
+        real_get(*args, **kwargs)
+        state['frame'] += 1
+        if recorder.done:
+            return [pygame.event.Event(pygame.QUIT)]
+        if state['frame'] % FLAP_PERIOD == 0:
+            return [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)]
+        return []
+
+    class UnpacedClock:
+        def tick(self, framerate=0):
+            # Report one frame's time so loops stepping on elapsed time
+            # still run one step per frame
+            return 1000 / 60
+
+        def get_fps(self):
+            return 0.0
+
+    pygame.display.set_mode = set_mode
+    pygame.display.flip = present(real_flip)
+    pygame.display.update = present(real_update)
+    pygame.event.get = get_events
+    # An idle game-over screen wakes up at once, to an event get_events drops
+    pygame.event.wait = lambda *args, **kwargs: pygame.event.Event(pygame.USEREVENT)
+    pygame.time.Clock = UnpacedClock
+    pygame.time.delay = lambda ms: 0
+    time.sleep = lambda seconds: None
+
+    random.seed(0)
+    sys.argv = [path]
+    error = None
+    wall_start = time.perf_counter()
+    try:
+        runpy.run_path(path, run_name='__main__')
+    except SystemExit:
+        pass
+    except Exception as exc:
+        error = f'{type(exc).__name__}: {exc}'
+    run = {'wall_s': round(time.perf_counter() - wall_start, 3)}
+    if error:
+        run['error'] = error
+    if state['first_frame'] is not None:
+        run['first_frame_at'] = state['first_frame']
+    return run
+
+
+def drive(path, frames):
+    """Run one variant in this process and return its measurements."""
+    recorder = FrameRecorder(frames)
+    run = run_variant(path, recorder)
+    hooks = COLLISION_HOOKS.get(os.path.basename(path), [])
+    result = {
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'collision_hooks': hooks,
+    }
+    wall = run.pop('wall_s')
+    result.update(run)
+    if not recorder.totals:
+        return result
+
+    updates = [total - draw - collision for total, draw, collision
+               in zip(recorder.totals, recorder.draws, recorder.collisions)]
+    result.update({
+        'frames': len(recorder.totals),
+        'fps': round(len(recorder.totals) / sum(recorder.totals), 1),
+        'wall_s': wall,
+        'frame': summarize(recorder.totals),
+        'update': summarize(updates),
+        'collision': summarize(recorder.collisions) if hooks else None,
+        'draw': summarize(recorder.draws),
+    })
+    return result
+
+
+def drive_engine(frames):
+    """The headless engine, for comparison: update only, no draw."""
+    from flappy_engine.core import Game
+
+    game = Game(random.Random(0))
+    samples = []
+    wall_start = time.perf_counter()
+    for frame in range(frames):
+        start = time.perf_counter()
+        if not game.step(frame % FLAP_PERIOD == 0):
+            game.reset()
+        samples.append(time.perf_counter() - start)
+    return {
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'frames': frames,
+        'fps': round(frames / sum(samples), 1),
+        'wall_s': round(time.perf_counter() - wall_start, 3),
+        'frame': summarize(samples),
+        'update': summarize(samples),
+        'collision': None,
+        'draw': None,
+    }
+
+
+def run_child(target, frames, module='flappy_engine.bench'):
+    """Run target ('engine' or a variant file) in a fresh interpreter.
+
+    The child is module's main() with --child target --frames frames, which
+    must print its results as one line of JSON.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy',
+               PYGAME_HIDE_SUPPORT_PROMPT='1')
+    launched = time.time()
+    proc = subprocess.run(
+        [sys.executable, '-m', module, '--child', target, '--frames', str(frames)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr else
+                f'exit status {proc.returncode}'}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    first_frame = result.pop('first_frame_at', None)
+    if first_frame is not None:
+        result['startup_ms'] = round((first_frame - launched) * 1000, 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--only', nargs='*', help='variant files (or "engine") to run')
+    parser.add_argument('--startup-target', type=float, default=STARTUP_TARGET_MS,
+                        metavar='MS', help='exit with status 1 if a variant takes longer '
+                        'than this to show its first frame')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        if args.child == 'engine':
+            result = drive_engine(args.frames)
+        else:
+            result = drive(os.path.join(REPO_ROOT, args.child), args.frames)
+        print(json.dumps(result))
+        return
+
+    targets = args.only or VARIANTS + ['engine']
+    results = {
+        'frames': args.frames,
+        'python': sys.version.split()[0],
+        'startup_target_ms': args.startup_target,
+        'variants': {},
+    }
+    slow_starts = []
+    for target in targets:
+        result = run_child(target, args.frames)
+        results['variants'][target] = result
+        if 'fps' in result:
+            line = (f"{target:36s} {result['fps']:>12.1f} fps  "
+                    f"p99 {result['frame']['p99_ms']:.3f} ms")
+            if 'startup_ms' in result:
+                line += f"  start {result['startup_ms']:.0f} ms"
+                if result['startup_ms'] > args.startup_target:
+                    line += ' (over target)'
+                    slow_starts.append(target)
+            print(line, file=sys.stderr)
+        else:
+            print(f"{target:36s} {result.get('error')}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if slow_starts:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
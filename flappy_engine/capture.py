@@ -0,0 +1,153 @@
+"""Stream finished frames to a raw video file or pipe without stalling the loop.
+
+grab(surface) is called once per frame after the display is presented. It
+copies the surface's pixels into one of a fixed pool of preallocated buffers
+(a single memcpy, about 0.15 ms for a 400x600 frame) and hands the buffer to a
+writer thread, which writes it out and returns it to the pool. If the writer
+falls behind and every buffer is still queued, the frame is dropped and
+counted instead of blocking the game. Nothing is allocated per frame.
+
+Frames are written exactly as they sit in the surface, with no pixel
+conversion: 'bgr0' for the usual 32-bit display. The target is either a file
+path, which is preallocated as a sparse file and written through mmap, or '-'
+for stdout, so the capture can be piped straight into an encoder:
+
+    PYGAME_HIDE_SUPPORT_PROMPT=1 python flappy_claude3.5.py --capture - |
+        ffmpeg -f rawvideo -pix_fmt bgr0 -s 400x600 -r 60 -i - session.mp4
+
+A file capture is trimmed to the frames written when it is closed, and a
+FILE.json sidecar records the size, pixel format, frame rate and frame counts.
+"""
+import json
+import mmap
+import os
+import queue
+import sys
+import threading
+
+# One minute at 60 fps; the file is sparse until frames are written to it
+MAX_FRAMES = 3600
+
+
+def pixel_format(surface):
+    """ffmpeg's name for the byte layout of surface's pixels."""
+    bytesize = surface.get_bytesize()
+    shifts = dict(zip('rgb', surface.get_shifts()[:3]))
+    # Little-endian: the channel at shift 8 * k is byte k
+    order = ''.join(sorted(shifts, key=shifts.get))
+    return order + '0' if bytesize == 4 else order + str(8 * bytesize)
+
+
+class FrameCapture:
+    def __init__(self, target, surface, fps=60, max_frames=MAX_FRAMES, buffers=8):
+        """Capture frames shaped like surface to target, a path or '-'.
+
+        buffers bounds how many frames may wait for the writer; max_frames
+        is the preallocated length of a file capture.
+        """
+        self.width, self.height = surface.get_size()
+        self.pitch = surface.get_pitch()
+        self.row_bytes = self.width * surface.get_bytesize()
+        self.frame_bytes = self.row_bytes * self.height
+        self.pix_fmt = pixel_format(surface)
+        self.fps = fps
+        self.target = target
+        self.grabbed = 0
+        self.written = 0
+        self.dropped = 0  # no free buffer, counted by grab()
+        self.lost = 0  # file full or reader gone, counted by the writer
+
+        self.free = queue.SimpleQueue()
+        for _ in range(buffers):
+            self.free.put(bytearray(self.frame_bytes))
+        self.pending = queue.Queue(buffers + 1)
+
+        if target == '-':
+            self.file = os.fdopen(os.dup(sys.stdout.fileno()), 'wb', buffering=0)
+            self.map = None
+            self.max_frames = None
+        else:
+            self.file = open(target, 'w+b')
+            self.file.truncate(self.frame_bytes * max_frames)
+            self.map = mmap.mmap(self.file.fileno(), self.frame_bytes * max_frames)
+            self.max_frames = max_frames
+        self.writer = threading.Thread(target=self._write_frames, name='frame-capture',
+                                       daemon=True)
+        self.writer.start()
+
+    def grab(self, surface):
+        """Queue the current contents of surface; never blocks."""
+        self.grabbed += 1
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        view = surface.get_view('0')
+        if self.pitch == self.row_bytes:
+            buffer[:] = view
+        else:
+            # Rows are padded in the surface; pack them
+            raw = memoryview(view)
+            for row in range(self.height):
+                start = row * self.pitch
+                buffer[row * self.row_bytes:(row + 1) * self.row_bytes] = \
+                    raw[start:start + self.row_bytes]
+            raw.release()
+        # Holding the view would keep the surface locked against blits
+        del view
+        self.pending.put_nowait(buffer)
+
+    def _write_frames(self):
+        frame_bytes = self.frame_bytes
+        while True:
+            buffer = self.pending.get()
+            if buffer is None:
+                return
+            try:
+                if self.map is None:
+                    self.file.write(buffer)
+                elif self.written < self.max_frames:
+                    offset = self.written * frame_bytes
+                    self.map[offset:offset + frame_bytes] = buffer
+                else:
+                    # The file is full; later frames are lost like slow ones
+                    self.lost += 1
+                    continue
+                self.written += 1
+            except (BrokenPipeError, ValueError):
+                # The reader went away; keep draining so grab() never blocks
+                self.lost += 1
+            finally:
+                self.free.put(buffer)
+
+    def close(self):
+        """Flush queued frames, trim the file and write its sidecar."""
+        if self.writer is None:
+            return
+        self.pending.put(None)
+        self.writer.join()
+        self.writer = None
+        if self.map is not None:
+            self.map.flush()
+            self.map.close()
+            self.file.truncate(self.written * self.frame_bytes)
+        try:
+            self.file.close()
+        except BrokenPipeError:
+            pass
+        if self.map is not None:
+            with open(self.target + '.json', 'w') as f:
+                json.dump(self.stats(), f, indent=2)
+                f.write('\n')
+
+    def stats(self):
+        return {
+            'width': self.width,
+            'height': self.height,
+            'pix_fmt': self.pix_fmt,
+            'fps': self.fps,
+            'grabbed': self.grabbed,
+            'written': self.written,
+            'dropped': self.dropped + self.lost,
+        }
@@ -0,0 +1,42 @@
+"""Reference bot controllers for the headless engine.
+
+A controller is called as controller(game) once per frame, before the frame is
+stepped, and returns whether to flap. Classes are instantiated once per episode
+so they can keep state between frames.
+"""
+
+
+def next_pipe(game):
+    """The first pipe whose right edge is still ahead of the bird's left edge."""
+    rules = game.rules
+    bird_left = game.bird.x + game.bird.offset
+    for pipe in game.pipes:
+        if pipe.x + rules.pipe_offset + rules.pipe_width > bird_left:
+            return pipe
+    return None
+
+
+def never(game):
+    return False
+
+
+def gap_follower(game):
+    """Flap whenever the bird is falling below the lower part of the next gap."""
+    pipe = next_pipe(game)
+    target = pipe.height - 35 if pipe is not None else 350
+    bird = game.bird
+    # Compare the middle of the bird, wherever its y is measured from
+    return bird.y + bird.offset + bird.size // 2 > target and bird.velocity > 0
+
+
+class Periodic:
+    """Flap every period frames regardless of the course."""
+
+    period = 55  # about level flight under the default physics
+
+    def __init__(self):
+        self.frame = 0
+
+    def __call__(self, game):
+        self.frame += 1
+        return self.frame % self.period == 0
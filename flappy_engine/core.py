@@ -0,0 +1,578 @@
+"""Headless simulation core.
+
+The rules here are the ones from flappy_claude3.5.py (Bird.update, Pipe.update,
+Pipe.collides_with and the checks in main()), with the rendering, the clock and
+pygame itself stripped out so the game can be stepped as fast as Python allows.
+
+Where the other implementations play differently (how a flap changes the
+velocity, when pipes spawn, what the ceiling does, what the bird collides
+with) the engine asks a Rules object. Rules holds flappy_claude3.5.py's
+answers and variants.py subclasses it once per implementation, so every
+variant runs on the same Game and BatchGame.
+"""
+import math
+import random
+from collections import namedtuple
+from itertools import islice
+
+from .pipes import PipeRing
+from .sweep import swept_box, swept_circle
+from .timing import ms_to_frames
+
+# Constants
+WINDOW_WIDTH = 400
+WINDOW_HEIGHT = 600
+FPS = 60
+GRAVITY = 0.25
+JUMP_SPEED = -7
+PIPE_SPEED = 3
+PIPE_GAP = 150
+PIPE_FREQUENCY = 1600  # milliseconds
+GROUND_Y = WINDOW_HEIGHT - 50
+
+# The pipe timer counted in frames instead of milliseconds
+PIPE_INTERVAL = ms_to_frames(PIPE_FREQUENCY, FPS)
+
+BIRD_X = WINDOW_WIDTH // 4
+BIRD_SIZE = 30
+PIPE_WIDTH = 60
+PIPE_MIN_HEIGHT = 150
+PIPE_MAX_HEIGHT = 400
+PIPE_COLORS = [
+    (0, 100, 0),  # Dark green
+    (139, 69, 19),  # Brown
+    (64, 64, 64)   # Dark gray
+]
+BIRD_SHAPES = ['square', 'circle', 'triangle']
+
+# Colors of the scene as GameView draws it
+BACKGROUND_COLOR = (173, 216, 230)  # Light blue
+GROUND_COLOR = (139, 69, 19)  # Dark brown
+BIRD_COLOR = (40, 40, 40)
+
+# The tunable physics of a game; replays and analyses carry one of these
+Physics = namedtuple('Physics', ['gravity', 'jump_speed', 'pipe_gap', 'pipe_speed'])
+PHYSICS = Physics(GRAVITY, JUMP_SPEED, PIPE_GAP, PIPE_SPEED)
+
+
+def pipe_capacity(pipe_speed=PIPE_SPEED):
+    """Most pipes on screen at once, plus one spare for the spawn frame."""
+    return (WINDOW_WIDTH + 60) // (pipe_speed * (PIPE_INTERVAL + 1)) + 2
+
+
+PIPE_CAPACITY = pipe_capacity()
+
+_span_cache = {}
+_extent_cache = {}
+
+
+def shape_spans(shape, size=BIRD_SIZE):
+    """Filled pixels of a bird shape as one (start, stop) column span per row.
+
+    This is the single definition of each shape: the sprites and collision
+    masks in sprites.py are rasterized from it, so headless collision is
+    pixel-identical to what is drawn.
+    """
+    key = (shape, size)
+    spans = _span_cache.get(key)
+    if spans is not None:
+        return spans
+    half = size / 2
+    spans = []
+    for row in range(size):
+        center_y = row + 0.5
+        if shape == 'square':
+            spans.append((0, size))
+            continue
+        if shape == 'circle':
+            dy = center_y - half
+            reach = math.sqrt(max(half * half - dy * dy, 0.0))
+        else:  # triangle, apex at the top center and base along the bottom
+            reach = half * center_y / size
+        # Pixels whose centers fall within [half - reach, half + reach]
+        start = math.ceil(half - reach - 0.5)
+        stop = math.floor(half + reach - 0.5) + 1
+        spans.append((start, max(start, stop)))
+    spans = _span_cache[key] = tuple(spans)
+    return spans
+
+
+def shape_extents(shape, size=BIRD_SIZE, pipe_width=PIPE_WIDTH):
+    """First and last bird row touching a pipe, for every horizontal offset.
+
+    Indexed by (pipe left - bird left) + pipe_width - 1; None where the pipe
+    columns miss every filled pixel. Since pipes span the full height above
+    and below the gap, these two rows decide an exact mask collision.
+    """
+    key = (shape, size, pipe_width)
+    extents = _extent_cache.get(key)
+    if extents is not None:
+        return extents
+    spans = shape_spans(shape, size)
+    extents = []
+    for offset in range(1 - pipe_width, size):
+        rows = [row for row, (start, stop) in enumerate(spans)
+                if start < stop and start < offset + pipe_width and stop > offset]
+        extents.append((rows[0], rows[-1]) if rows else None)
+    extents = _extent_cache[key] = tuple(extents)
+    return extents
+
+
+class Rules:
+    """How one implementation plays, as settings and hooks the engine calls.
+
+    Coordinates are the implementation's own: bird_x and bird.y are whatever
+    point it moves (the center here, the top-left corner in some others) and
+    pipe.x is its pipe position, with the pipe's left edge at x + pipe_offset.
+    pipe.height is always the top of the bottom pipe.
+
+    Two rules are equal when they are the same plugin with the same settings,
+    so a copy of RULES, or one unpickled in a worker process, still counts as
+    the default rules.
+    """
+
+    name = 'claude3.5'
+    physics = PHYSICS
+
+    # Bird start and its collision box, bird_offset from (x, y)
+    bird_x = BIRD_X
+    bird_y = WINDOW_HEIGHT // 2
+    bird_offset = -15
+    bird_size = BIRD_SIZE
+    # Collide with the drawn shape rather than its bounding box
+    masks = True
+    # Snap the box to whole pixels like a pygame.Rect
+    truncate = True
+    # Stop the bird at the top of the screen instead of killing it
+    clamp_ceiling = False
+    ground_y = GROUND_Y
+
+    pipe_width = PIPE_WIDTH
+    pipe_offset = -PIPE_WIDTH // 2
+    # Lower edge of the bottom pipe
+    pipe_bottom = WINDOW_HEIGHT
+    pipe_colors = PIPE_COLORS
+    spawn_x = WINDOW_WIDTH + 30
+    # Frames between timed spawns, None for none, and whether next_interval()
+    # draws each one from the rng instead
+    pipe_interval = PIPE_INTERVAL
+    random_interval = False
+    # Pipes spawned by reset(), and whether an expired pipe is replaced at once
+    initial_pipes = 0
+    respawn = False
+    # A pipe scores once x < score_x and expires once x < expire_x
+    score_x = BIRD_X
+    expire_x = -30
+
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __hash__(self):
+        return hash(type(self))
+
+    def jump(self, velocity, jump_speed):
+        """Velocity after a flap; works on NumPy arrays too."""
+        return jump_speed
+
+    def grounded(self, y):
+        """Whether a bird at y has hit the ground; works on NumPy arrays too."""
+        return y > self.ground_y
+
+    def hitbox(self, shape):
+        """(offset, size, extents) of a bird of this shape."""
+        if self.masks:
+            extents = shape_extents(shape, self.bird_size, self.pipe_width)
+        else:
+            extents = shape_extents('square', self.bird_size, self.pipe_width)
+        return self.bird_offset, self.bird_size, extents
+
+    def height_range(self, gap):
+        """Lowest and highest top of the bottom pipe, both inclusive."""
+        return PIPE_MIN_HEIGHT, PIPE_MAX_HEIGHT
+
+    def pipe_height(self, rng, gap):
+        """Draw the top of the next bottom pipe."""
+        return rng.randint(*self.height_range(gap))
+
+    def next_interval(self, rng):
+        """Frames until the next timed spawn, drawn after every spawn."""
+        return self.pipe_interval
+
+    def pipe_capacity(self, pipe_speed):
+        """Most pipes on screen at once, plus one spare for the spawn frame."""
+        if self.pipe_interval is None:
+            return self.initial_pipes + 1
+        return (self.spawn_x - self.expire_x) // (pipe_speed * (self.pipe_interval + 1)) + 2
+
+
+RULES = Rules()
+
+
+class Bird:
+    __slots__ = ('x', 'y', 'velocity', 'shape', 'extents', 'rules', 'offset', 'size',
+                 'truncate')
+
+    def __init__(self, shape='square', rules=RULES):
+        self.shape = shape
+        self.rules = rules
+        self.offset, self.size, self.extents = rules.hitbox(shape)
+        self.truncate = rules.truncate
+        self.reset()
+
+    def reset(self):
+        self.x = self.rules.bird_x
+        self.y = self.rules.bird_y
+        self.velocity = 0
+
+    def jump(self):
+        self.velocity = self.rules.jump(self.velocity, self.rules.physics.jump_speed)
+
+    def get_rect(self):
+        offset = self.offset
+        if self.truncate:
+            # Same truncation pygame.Rect applies to float coordinates
+            return (int(self.x + offset), int(self.y + offset), self.size, self.size)
+        return (self.x + offset, self.y + offset, self.size, self.size)
+
+
+class Pipe:
+    __slots__ = ('x', 'height', 'color', 'passed', 'gap')
+
+    def __init__(self, x, rng=random, gap=PIPE_GAP, height=None, colors=PIPE_COLORS):
+        self.reset(x, rng, gap, height, colors)
+
+    def reset(self, x, rng=random, gap=PIPE_GAP, height=None, colors=PIPE_COLORS):
+        self.x = x
+        self.height = rng.randint(PIPE_MIN_HEIGHT, PIPE_MAX_HEIGHT) if height is None else height
+        self.color = rng.choice(colors)
+        self.passed = False
+        self.gap = gap
+
+    def collides_with(self, bird_rect, extents=None, rules=RULES):
+        # Rect.colliderect against the top and bottom pipe rects (a zero-height
+        # top pipe never collides, like an empty pygame.Rect), then the exact
+        # mask test from the bird's shape_extents. Row r of the bird covers
+        # [by + r, by + r + 1), which also holds for an untruncated box.
+        bx, by, bw, bh = bird_rect
+        width = rules.pipe_width
+        left = self.x + rules.pipe_offset
+        if bx >= left + width or bx + bw <= left:
+            return False
+        if extents is None:
+            first, last = 0, bh - 1
+        else:
+            extent = extents[left - bx + width - 1]
+            if extent is None:
+                return False
+            first, last = extent
+        top = self.height - self.gap
+        if top > 0 and by < top and by + bh > 0 and by + first < top:
+            return True
+        return (by + bh > self.height and by < rules.pipe_bottom
+                and by + last + 1 > self.height)
+
+
+def check_course(course, rules, physics):
+    """Raise ValueError unless course can pick the gaps of a game with rules and physics.
+
+    A course checks its heights against one rules plugin's geometry and one
+    physics config, so under any others its guarantee is void.
+    """
+    if course is None:
+        return
+    if course.analysis.rules != rules:
+        raise ValueError(f'course is built for the {course.analysis.rules.name} rules, '
+                         f'not {rules.name}')
+    if course.analysis.physics != physics:
+        raise ValueError(f'course is built for {course.analysis.physics}, not {physics}')
+
+
+def check_rules(game, what):
+    """Raise ValueError unless game plays the default rules, which what is drawn for."""
+    if game.rules != RULES:
+        raise ValueError(f'{what} draws the {RULES.name} scene, not {game.rules.name}')
+
+
+def spawn_pipe(game):
+    """Add a pipe at the right edge, drawing its height and then its color."""
+    rng = game.rng
+    rules = game.rules
+    gap = game.physics.pipe_gap
+    height = None if game.course is None else game.course.next_height(rng, game.pipe_interval)
+    if height is None:
+        height = rules.pipe_height(rng, gap)
+    game.pipes.spawn(rules.spawn_x, rng, gap, height, rules.pipe_colors)
+
+
+def scroll(game):
+    """Spawn, move, score and expire the pipes of a Game or BatchGame.
+
+    Nothing here depends on the bird, so a batch of birds shares one course.
+    Returns how many pipes were passed this frame.
+    """
+    rules = game.rules
+    pipes = game.pipes
+    interval = game.pipe_interval
+    if interval is not None and game.frame - game.last_pipe > interval:
+        spawn_pipe(game)
+        game.last_pipe = game.frame
+        game.pipe_interval = rules.next_interval(game.rng)
+    return move_pipes(game)
+
+
+def move_pipes(game, frames=1):
+    """Move, score and expire the pipes frames frames at once.
+
+    Returns how many pipes were passed. Only the oldest pipe can expire, on
+    the last of the frames, so they must not run past the frame it leaves on.
+    """
+    rules = game.rules
+    pipes = game.pipes
+    count = pipes.count
+    if not count:
+        return 0
+    distance = game.physics.pipe_speed * frames
+    records = pipes.records
+    head = pipes.head
+    for pipe in islice(records, head, head + count):
+        pipe.x -= distance
+    # Score before expiring, for rules that score a pipe as it leaves
+    passed = pipes.advance(rules.score_x)
+    # Pipes are spawned in order, so only the oldest can expire
+    if records[pipes.head].x < rules.expire_x:
+        pipes.expire()
+        if rules.respawn:
+            spawn_pipe(game)
+    return passed
+
+
+def begin_stretch(game, frames):
+    """Spawn a pipe that is due and return how many of frames can be played at once.
+
+    A timed spawn can only open a stretch and an expiry only close it, so a
+    stretch ends before the next spawn is due and on the frame the oldest
+    pipe leaves, and move_pipes() can then move the pipes across it in one go.
+    """
+    rules = game.rules
+    interval = game.pipe_interval
+    if interval is not None:
+        if game.frame + 1 - game.last_pipe > interval:
+            spawn_pipe(game)
+            game.last_pipe = game.frame + 1
+            game.pipe_interval = interval = rules.next_interval(game.rng)
+        frames = min(frames, game.last_pipe + interval - game.frame)
+    pipes = game.pipes
+    pipe_speed = game.physics.pipe_speed
+    if pipes.count and pipe_speed > 0:
+        frames = min(frames, (pipes[0].x - rules.expire_x) // pipe_speed + 1)
+    return frames
+
+
+class Game:
+    """One game of Flappy Bird advanced a frame at a time by step().
+
+    Every random choice goes through rng, so a random.Random(seed) gives the
+    same pipe course on every run. shape picks the bird's collision mask and
+    physics the constants the game is played with, by default those of rules,
+    which selects the implementation whose rules are played (see variants.py).
+    A courses.Course, if given, picks the gap heights so that the game can
+    always be survived; a course is built for one rules plugin and physics
+    config, and ValueError is raised for any others.
+
+    With swept=True, pipe collisions are tested continuously along the
+    bird's and pipes' straight-line moves between frames instead of at each
+    frame's positions, so nothing tunnels through a pipe lip at any speed.
+    The bird is then a box, or a circle if it is a masked circle, at its
+    exact position. Swept games can be advanced several frames per call
+    without changing how they end.
+    """
+
+    def __init__(self, rng=random, shape='square', physics=None, course=None, rules=RULES,
+                 swept=False):
+        self.rng = rng
+        self.rules = rules
+        self.physics = physics = physics or rules.physics
+        check_course(course, rules, physics)
+        self.course = course
+        self.bird = Bird(shape, rules)
+        self.pipes = PipeRing(rules.pipe_capacity(physics.pipe_speed), Pipe)
+        # Moves the pipe span [x + offset, x + offset + width) onto the
+        # [x - width / 2, x + width / 2) that PipeRing.overlapping tests
+        self.pipe_half = rules.pipe_width // 2
+        self.pipe_shift = rules.pipe_offset + self.pipe_half
+        self.swept = swept
+        if swept:
+            self.step = self._step_swept
+        self.best_score = 0
+        self.reset()
+
+    def reset(self):
+        self.bird.reset()
+        self.pipes.clear()
+        self.score = 0
+        self.frame = 0
+        self.last_pipe = 0
+        self.game_active = True
+        self.death_cause = None
+        if self.course is not None:
+            self.course.reset()
+        self.pipe_interval = self.rules.next_interval(self.rng)
+        for _ in range(self.rules.initial_pipes):
+            spawn_pipe(self)
+
+    def step(self, action=False):
+        """Advance one frame, flapping first if action is true.
+
+        Returns whether the game is still active afterwards.
+        """
+        if not self.game_active:
+            return False
+        bird = self.bird
+        rules = self.rules
+        gravity, jump_speed, pipe_gap, pipe_speed = self.physics
+        velocity = bird.velocity
+        if action:
+            velocity = rules.jump(velocity, jump_speed)
+        velocity += gravity
+        bird.y = y = bird.y + velocity
+        bird.velocity = velocity
+        ceiling = y < 0
+        if ceiling and rules.clamp_ceiling:
+            bird.y = bird.velocity = y = 0
+            ceiling = False
+        self.frame += 1
+
+        # Score off the pipe cursor, then collide only with the pipes around it
+        self.score += scroll(self)
+        pipes = self.pipes
+        if pipes.count:
+            bird_rect = bird.get_rect()
+            left = bird_rect[0] - self.pipe_shift
+            for pipe in pipes.overlapping(left, left + bird_rect[2], self.pipe_half):
+                if pipe.collides_with(bird_rect, bird.extents, rules):
+                    self._end('pipe')
+                    break
+
+        # Check ground/ceiling collision
+        if ceiling:
+            self._end('ceiling')
+        elif rules.grounded(y):
+            self._end('ground')
+        return self.game_active
+
+    def advance(self, frames, action=False):
+        """Advance up to frames frames, flapping on the first if action is true.
+
+        Ends exactly as step(action) followed by frames - 1 step(False) calls
+        would. A swept game moves through each stretch without a spawn or
+        expiry in one go. The bird's path over the stretch is first checked
+        against each pipe's as a whole, and only a pipe it comes near is swept
+        frame by frame.
+        Returns whether the game is still active.
+        """
+        if not self.swept:
+            active = self.step(action)
+            for _ in range(frames - 1):
+                if not active:
+                    break
+                active = self.step()
+            return active
+        while frames > 0 and self.game_active:
+            frames -= self._stretch(frames, action)
+            action = False
+        return self.game_active
+
+    def _step_swept(self, action=False):
+        return self.advance(1, action)
+
+    def _stretch(self, frames, action):
+        """Play up to frames frames of a swept game; returns how many were played."""
+        rules = self.rules
+        gravity, jump_speed, pipe_gap, pipe_speed = self.physics
+        frames = begin_stretch(self, frames)
+
+        # The bird's position after each frame, up to a ceiling or ground death
+        bird = self.bird
+        velocity = bird.velocity
+        if action:
+            velocity = rules.jump(velocity, jump_speed)
+        y = bird.y
+        path = [y]
+        velocities = [velocity]
+        cause = None
+        for played in range(1, frames + 1):
+            velocity += gravity
+            y += velocity
+            if y < 0 and rules.clamp_ceiling:
+                y = velocity = 0
+            path.append(y)
+            velocities.append(velocity)
+            if y < 0:
+                cause = 'ceiling'
+                break
+            if rules.grounded(y):
+                cause = 'ground'
+                break
+
+        # Pipe deaths take precedence on the same frame, as in _end
+        hit = self._sweep_pipes(path)
+        if hit is not None:
+            played = hit
+            cause = 'pipe'
+        bird.y = path[played]
+        bird.velocity = velocities[played]
+        self.frame += played
+        self.score += move_pipes(self, played)
+        if cause:
+            self._end(cause)
+        return played
+
+    def _sweep_pipes(self, path):
+        """First frame of path on which the bird runs into a pipe, or None."""
+        rules = self.rules
+        bird = self.bird
+        pipe_speed = self.physics.pipe_speed
+        frames = len(path) - 1
+        size = bird.size
+        left = bird.x + bird.offset
+        low = min(path) + bird.offset
+        high = max(path) + bird.offset + size
+        circle = rules.masks and bird.shape == 'circle'
+        radius = size / 2
+        hit = None
+        start = left - self.pipe_shift
+        # Any pipe whose span over the stretch reaches the bird's column
+        for pipe in self.pipes.overlapping(start, start + size + frames * pipe_speed,
+                                           self.pipe_half):
+            top = pipe.height - pipe.gap
+            rects = []
+            if top > 0 and low < top and high > 0:
+                rects.append((0, top))
+            if low < rules.pipe_bottom and high > pipe.height:
+                rects.append((pipe.height, rules.pipe_bottom - pipe.height))
+            if not rects:
+                continue
+            pipe_left = pipe.x + rules.pipe_offset
+            for frame in range(1, frames + 1 if hit is None else hit):
+                # Against the pipe where it stood, the bird also moves right
+                rect_left = pipe_left - (frame - 1) * pipe_speed
+                y = path[frame - 1] + bird.offset
+                dy = path[frame] - path[frame - 1]
+                for rect_top, rect_height in rects:
+                    rect = (rect_left, rect_top, rules.pipe_width, rect_height)
+                    if circle:
+                        t = swept_circle(left + radius, y + radius, radius, pipe_speed, dy, rect)
+                    else:
+                        t = swept_box((left, y, size, size), pipe_speed, dy, rect)
+                    if t is not None:
+                        hit = frame
+                        break
+                if hit == frame:
+                    break
+        return hit
+
+    def _end(self, cause):
+        if self.game_active:
+            self.game_active = False
+            self.death_cause = cause
+            self.best_score = max(self.score, self.best_score)
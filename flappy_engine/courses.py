@@ -0,0 +1,378 @@
+"""Pipe courses that are guaranteed to be survivable.
+
+Random gap heights can ask for more than the physics allows. A gap may be too
+far from the previous one to reach within the spawn interval, or it may be
+impossible to hold for the frames the pipe takes to pass. Course draws heights
+from the rng exactly as the game's rules do. It keeps the exact set of states
+the bird can be in when each pipe has passed, and accepts a height only if that
+set stays non-empty. A height that fails is repaired to the nearest feasible
+one, or redrawn. Every course it produces can be survived by some input
+sequence.
+
+The reachable sets come from exact reachability. Bird positions and velocities
+are exact multiples of a small power of two, so the states one frame can hold
+are bitsets over y, one per velocity. A frame of search is a shift and an AND
+per velocity. Everything else is read off the Rules plugin: whether a flap
+sets the velocity or adds to it, the spawn interval or respawn, the height
+range, and the ground. Collision is tested against the box covering every
+shape's hitbox, which is sound for every shape.
+
+Between gaps the bird is kept within the span of the two, and positions are
+measured from the current gap. Where both gaps lie clear of the ceiling and
+the ground, a transition then depends only on the reachable set, on h2 - h1
+and on the frames between the pipes. The free flight between gaps forgets
+where the bird came from, so the set after a pipe usually depends on h2 - h1
+alone. For rules with a fixed spawn period, reachability() builds the table of
+that once per rules and physics, with every first pipe, and generation is then
+a dictionary lookup per pipe. Rules that draw the interval between pipes
+compute and memoize each transition as it comes up.
+
+The table is exact. Adding states to a set never removes any from the sets
+after it, so a set's transition lies between those of any set it contains
+and any set containing it. The table is built from two such bounds: a
+ceiling holding every state the bird can be in once past a gap, and a floor
+common to every set the first pipes and the table itself produce. Where the
+two agree on a delta, every set between them has that transition. Other
+deltas, and sets outside the bounds, are computed and memoized one at a time.
+Building the table for the default physics takes a few seconds.
+"""
+import random
+from fractions import Fraction
+
+from .core import BIRD_SHAPES, RULES
+
+# Draws a 'reject' Course makes before it falls back to repairing
+MAX_REDRAWS = 16
+
+_analyses = {}
+
+
+def reachability(rules=RULES, physics=None):
+    """The memoized Reachability of a rules plugin and physics config.
+
+    Its table is built unless the rules draw the interval between pipes.
+    """
+    physics = physics or rules.physics
+    analysis = _analyses.get((rules, physics))
+    if analysis is None:
+        analysis = Reachability(rules, physics)
+        if not rules.random_interval:
+            analysis.build()
+        _analyses[rules, physics] = analysis
+    return analysis
+
+
+def _shift(bits, n):
+    return bits << n if n >= 0 else bits >> -n
+
+
+class Reachability:
+    """States the bird can reach past each pipe under one rules and physics config.
+
+    A reachable set is referred to by an integer id. first() and transition()
+    return the id of the set after the next pipe, or None if no state
+    survives it. Both take the interval the pipe was spawned after, which
+    only matters for rules that draw it.
+    """
+
+    def __init__(self, rules=RULES, physics=None):
+        self.rules = rules
+        self.physics = physics = physics or rules.physics
+        gravity, jump_speed, pipe_gap, pipe_speed = physics
+        # y units per pixel: every position and velocity is a whole number of them
+        unit = max(Fraction(gravity).denominator, Fraction(jump_speed).denominator)
+        if unit > 256:
+            raise ValueError('gravity and jump_speed must be multiples of 1/256')
+        if pipe_speed <= 0:
+            raise ValueError('courses need pipes that move towards the bird')
+        self.unit = unit
+        self.gravity = int(gravity * unit)
+        # A flap sets the velocity to flap_velocity, or adds it
+        self.flap_velocity = int((jump_speed + gravity) * unit)
+        if all(rules.jump(velocity, jump_speed) == jump_speed for velocity in (1, 2)):
+            self.adds = False
+        elif all(rules.jump(velocity, jump_speed) == velocity + jump_speed
+                 for velocity in (1, 2)):
+            self.adds = True
+        else:
+            raise ValueError(f'the {rules.name} flap neither sets nor adds to the velocity')
+
+        # The box covering the hitbox of every shape
+        boxes = [rules.hitbox(shape)[:2] for shape in BIRD_SHAPES]
+        low = min(offset for offset, size in boxes)
+        size = max(offset + size for offset, size in boxes) - low
+
+        # Frames after its spawn that a pipe overlaps the bird's box
+        bird_left = int(rules.bird_x + low)
+        window = []
+        frame = 1
+        left = rules.spawn_x - pipe_speed + rules.pipe_offset
+        while left + rules.pipe_width > bird_left:
+            if bird_left + size > left:
+                window.append(frame)
+            frame += 1
+            left -= pipe_speed
+        self.window_start, self.window_end = window[0], window[-1]
+        self.window = len(window)
+
+        if rules.pipe_interval is not None and not rules.initial_pipes and not rules.respawn:
+            self.respawn_period = None
+        elif rules.pipe_interval is None and rules.initial_pipes == 1 and rules.respawn:
+            # The one pipe is replaced on the frame it expires
+            period = 1
+            while rules.spawn_x - pipe_speed * period >= rules.expire_x:
+                period += 1
+            self.respawn_period = period
+        else:
+            raise ValueError(f'courses cannot follow how {rules.name} spawns pipes')
+        # pipe_interval is the shortest, for rules that draw it
+        self.period = self._timing(None)[1]
+        # The last two frames past a gap are inside it, and one pipe is
+        # overlapped at a time
+        if not 2 <= self.window <= self.period:
+            raise ValueError(f'{rules.name} pipes overlap the bird for {self.window} frames '
+                             f'out of every {self.period}')
+
+        lowest, highest = rules.height_range(pipe_gap)
+        self.heights = range(lowest, highest + 1)
+        # Positions are bit indexes, offset so positions measured from any
+        # gap are non-negative
+        self.offset = (self.heights.stop + 1) * unit
+        # Positions the bird is alive at: 0 <= y and not grounded, with the
+        # highest found by bisection
+        if rules.grounded(0):
+            raise ValueError(f'a {rules.name} bird is grounded at the top of the screen')
+        alive, dead = 0, 1
+        while not rules.grounded(Fraction(dead, unit)):
+            alive, dead = dead, dead * 2
+        while dead - alive > 1:
+            middle = (alive + dead) // 2
+            if rules.grounded(Fraction(middle, unit)):
+                dead = middle
+            else:
+                alive = middle
+        self.alive = (self.offset, self.offset + dead)
+        # The bird's box is inside a gap at y - h in [start, stop), where
+        # the box may be truncated to whole pixels like a pygame.Rect
+        start = self._index(-pipe_gap - low)
+        if rules.truncate:
+            stop = self._index(1 - size - low)
+        else:
+            stop = self._index(-size - low) + 1
+        self.inside = (start, stop)
+        # Heights whose gap is clear of the ceiling and the ground
+        self.interior = {height for height in self.heights
+                         if self._clip(start, stop, height) == self.inside}
+
+        self._sets = []
+        self._ids = {}
+        self._first = {}
+        self._transitions = {}
+        # Filled by build(): the set after a pipe by delta, for the sets
+        # between floor and ceiling
+        self._by_delta = {}
+        self._floor = self._ceiling = None
+        self._bounded = []
+
+    def _index(self, y):
+        return self.offset + y * self.unit
+
+    def _mask(self, start, stop):
+        return ((1 << max(stop - start, 0)) - 1) << start
+
+    def _clip(self, start, stop, height):
+        # The part of [start, stop), measured from a gap at height, the bird is alive in
+        shift = height * self.unit
+        return max(start, self.alive[0] - shift), min(stop, self.alive[1] - shift)
+
+    def _timing(self, interval):
+        # Frames from reset to the first pipe's spawn, and between spawns
+        if self.respawn_period is not None:
+            return 0, self.respawn_period
+        if interval is None:
+            interval = self.rules.pipe_interval
+        return interval, interval + 1
+
+    def first(self, height, interval=None):
+        """Set past the first pipe of a game, if its gap is at height."""
+        spawn = self._timing(interval)[0]
+        key = (height, spawn)
+        if key not in self._first:
+            shift = height * self.unit
+            alive = self._mask(*self.alive)
+            start, stop = self._clip(*self.inside, height)
+            window = self._mask(start + shift, stop + shift)
+            frames = spawn + self.window_end
+            masks = [alive] * (frames - self.window) + [window] * self.window
+            tracks = {0: 1 << self._index(self.rules.bird_y)}
+            self._first[key] = self._intern(self._forward(tracks, masks), shift)
+        return self._first[key]
+
+    def transition(self, state, previous, height, interval=None):
+        """Set past the next pipe, from set state past a gap at previous to one at height."""
+        period = self._timing(interval)[1]
+        delta = height - previous
+        interior = previous in self.interior and height in self.interior
+        if interior and period == self.period:
+            if self._bounded[state] and delta in self._by_delta:
+                return self._by_delta[delta]
+        key = (state, delta, period) if interior else (state, previous, delta, period)
+        if key not in self._transitions:
+            self._transitions[key] = self._pass(self._sets[state], delta, period,
+                                                None if interior else previous)
+        return self._transitions[key]
+
+    def _pass(self, tracks, delta, period, previous=None):
+        # previous, if given, clips the masks to where a bird is alive between
+        # a gap at previous and the next
+        shift = delta * self.unit
+        start, stop = self.inside
+        window = (start + shift, stop + shift)
+        band = (min(start, start + shift), max(stop, stop + shift))
+        if previous is not None:
+            window = self._clip(*window, previous)
+            band = self._clip(*band, previous)
+        window = self._mask(*window)
+        band = self._mask(*band)
+        masks = [band] * (period - self.window) + [window] * self.window
+        return self._intern(self._forward(tracks, masks), shift)
+
+    def build(self):
+        """Tabulate transitions by delta alone wherever the bounds allow."""
+        if not self.interior:
+            return
+        low, high = min(self.interior), max(self.interior)
+        deltas = range(low - high, high - low + 1)
+        # Past a gap the bird is inside it, and the last frame there moved
+        # it less than the gap's height; without flaps that add up, flapping
+        # gives the lowest velocity
+        start, stop = self.inside
+        window = self._mask(start, stop)
+        lowest = start - stop if self.adds else self.flap_velocity
+        self._ceiling = {velocity: window for velocity in range(lowest, stop - start + 1)}
+        ceiling = {delta: self._pass(self._ceiling, delta, self.period) for delta in deltas}
+        family = {self.first(height) for height in self.interior}
+        family.update(ceiling.values())
+        family.discard(None)
+        floor = None
+        for state in family:
+            tracks = self._sets[state]
+            if floor is None:
+                floor = dict(tracks)
+            else:
+                floor = {velocity: positions & tracks[velocity]
+                         for velocity, positions in floor.items() if velocity in tracks}
+        self._floor = {velocity: positions for velocity, positions in (floor or {}).items()
+                       if positions}
+        self._bounded = [self._between(tracks) for tracks in self._sets]
+        for delta in deltas:
+            if self._pass(self._floor, delta, self.period) == ceiling[delta]:
+                self._by_delta[delta] = ceiling[delta]
+
+    def _between(self, tracks):
+        # Whether floor <= tracks <= ceiling, state by state
+        if self._floor is None:
+            return False
+        ceiling = self._ceiling
+        return (all(positions & ~tracks.get(velocity, 0) == 0
+                    for velocity, positions in self._floor.items())
+                and all(positions & ~ceiling.get(velocity, 0) == 0
+                        for velocity, positions in tracks.items()))
+
+    def _forward(self, tracks, masks):
+        """Advance velocity -> positions bitsets one frame per allowed mask."""
+        gravity = self.gravity
+        flap = self.flap_velocity
+        adds = self.adds
+        for mask in masks:
+            advanced = {}
+            flapped = 0
+            for velocity, positions in tracks.items():
+                if adds:
+                    lifted = velocity + flap
+                    moved = _shift(positions, lifted) & mask
+                    if moved:
+                        advanced[lifted] = advanced.get(lifted, 0) | moved
+                else:
+                    flapped |= positions
+                velocity += gravity
+                positions = _shift(positions, velocity) & mask
+                if positions:
+                    advanced[velocity] = advanced.get(velocity, 0) | positions
+            flapped = _shift(flapped, flap) & mask
+            if flapped:
+                advanced[flap] = advanced.get(flap, 0) | flapped
+            tracks = advanced
+        return tracks
+
+    def _intern(self, tracks, shift):
+        # Re-measure from the new gap and share identical sets
+        if not tracks:
+            return None
+        tracks = tuple(sorted((velocity, _shift(positions, -shift))
+                              for velocity, positions in tracks.items()))
+        state = self._ids.get(tracks)
+        if state is None:
+            state = self._ids[tracks] = len(self._sets)
+            self._sets.append(dict(tracks))
+            self._bounded.append(self._between(self._sets[state]))
+        return state
+
+
+class Course:
+    """Gap heights for one game, drawn from rng with impossible transitions fixed.
+
+    The game must be played by rules with physics, by default the rules' own.
+    policy 'repair' moves an infeasible height to the nearest feasible one,
+    which keeps the rng in step with an unconstrained game; 'reject' draws
+    again, up to MAX_REDRAWS times, before repairing.
+    """
+
+    def __init__(self, physics=None, policy='repair', rules=RULES):
+        if policy not in ('repair', 'reject'):
+            raise ValueError(f'unknown policy {policy!r}')
+        self.analysis = reachability(rules, physics)
+        self.policy = policy
+        self.reset()
+
+    def reset(self):
+        self.previous = None
+        self.state = None
+        self.repaired = 0
+
+    def _after(self, height, interval):
+        if self.previous is None:
+            return self.analysis.first(height, interval)
+        return self.analysis.transition(self.state, self.previous, height, interval)
+
+    def _draw(self, rng):
+        return self.analysis.rules.pipe_height(rng, self.analysis.physics.pipe_gap)
+
+    def next_height(self, rng=random, interval=None):
+        """The next gap height; interval is the game's pipe_interval as the pipe spawns."""
+        height = self._draw(rng)
+        state = self._after(height, interval)
+        if state is None and self.policy == 'reject':
+            for _ in range(MAX_REDRAWS):
+                height = self._draw(rng)
+                state = self._after(height, interval)
+                if state is not None:
+                    break
+        if state is None:
+            height, state = self._repair(height, interval)
+            self.repaired += 1
+        self.previous = height
+        self.state = state
+        return height
+
+    def _repair(self, height, interval):
+        heights = self.analysis.heights
+        for distance in range(1, len(heights)):
+            for candidate in (height - distance, height + distance):
+                if candidate in heights:
+                    state = self._after(candidate, interval)
+                    if state is not None:
+                        return candidate, state
+        where = 'first pipe' if self.previous is None else f'pipe after {self.previous}'
+        raise ValueError(f'no survivable gap for the {where} under {self.analysis.rules.name} '
+                         f'and {self.analysis.physics}')
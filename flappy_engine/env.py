@@ -0,0 +1,214 @@
+"""Gym-style reinforcement learning environments over the headless engine.
+
+FlappyEnv wraps one core.Game behind reset()/step(action) in the Gymnasium
+calling convention, and VecEnv steps K games per call and resets finished ones
+in place. Both return a state vector per game:
+
+    [bird y, bird velocity, next pipe x, next gap height]
+
+where the gap height is the pipe's height, the y of the top of the bottom pipe.
+The reward is the number of pipes passed during the step.
+
+Observations are written into arrays owned by the environment and returned
+without copying, so they are overwritten by the next call; copy them to keep
+them. With pixels=True each game is also drawn every step and the pixels are
+returned as a pygame.surfarray.pixels3d view of the surface it is drawn on,
+shaped (width, height, 3) per game. The views stay valid for the life of the
+environment because the games are drawn with render.paint_game, which works on
+the locked surface. pixels=(width, height) instead returns downsampled
+grayscale frames from raster.Rasterizer, shaped (height, width) per game,
+without going through pygame at all.
+"""
+import random
+
+import numpy as np
+
+from .controllers import next_pipe
+from .core import (PHYSICS, PIPE_MAX_HEIGHT, PIPE_MIN_HEIGHT, WINDOW_HEIGHT, WINDOW_WIDTH,
+                   Game)
+from .raster import Rasterizer
+
+OBSERVATION_SIZE = 4
+
+# What the bird sees before the first pipe spawns: a pipe at the spawn point
+# with the gap in the middle of its range
+NO_PIPE_X = WINDOW_WIDTH + 30
+NO_PIPE_HEIGHT = (PIPE_MIN_HEIGHT + PIPE_MAX_HEIGHT) // 2
+
+
+def observe(game, out):
+    """Write game's state vector into out."""
+    bird = game.bird
+    pipe = next_pipe(game)
+    out[0] = bird.y
+    out[1] = bird.velocity
+    if pipe is None:
+        out[2] = NO_PIPE_X
+        out[3] = NO_PIPE_HEIGHT
+    else:
+        out[2] = pipe.x
+        out[3] = pipe.height
+
+
+def _pixel_surface(count):
+    # One surface with the games side by side, so a single pixels3d view
+    # covers all of them and splits into per-game views without copying.
+    # pygame is only needed for pixels, so it is imported here.
+    import pygame
+    surface = pygame.Surface((WINDOW_WIDTH * count, WINDOW_HEIGHT))
+    tiles = [surface.subsurface((WINDOW_WIDTH * i, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
+             for i in range(count)]
+    pixels = pygame.surfarray.pixels3d(surface).reshape(
+        count, WINDOW_WIDTH, WINDOW_HEIGHT, 3)
+    return surface, tiles, pixels
+
+
+class FlappyEnv:
+    """One game behind reset()/step(action).
+
+    Each reset without a seed plays the course after the previous one, as
+    flappy_claude3.5.py does on restart. Episodes still running after
+    max_frames are truncated.
+    """
+
+    def __init__(self, seed=None, shape='square', physics=PHYSICS, pixels=False,
+                 max_frames=None):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.game = Game(self.rng, shape, physics)
+        self.max_frames = max_frames
+        self.observation = np.zeros(OBSERVATION_SIZE)
+        self.pixels = self.rasterizer = None
+        if isinstance(pixels, tuple):
+            self.rasterizer = Rasterizer(*pixels)
+            self.frames = np.zeros((1, pixels[1], pixels[0]), dtype=np.uint8)
+            self.pixels = self.frames[0]
+        elif pixels:
+            self.surface, tiles, pixels = _pixel_surface(1)
+            self.tile = tiles[0]
+            self.pixels = pixels[0]
+            from .render import paint_game
+            self.paint = paint_game
+        self.episodes = 0
+
+    def reset(self, seed=None):
+        """Start a new game and return (observation, info)."""
+        if seed is not None:
+            self.seed = seed
+        elif self.episodes:
+            self.seed += 1
+        self.episodes += 1
+        self.rng.seed(self.seed)
+        self.game.reset()
+        return self._observe(), {'seed': self.seed}
+
+    def step(self, action):
+        """Advance one frame; returns (obs, reward, terminated, truncated, info)."""
+        game = self.game
+        score = game.score
+        terminated = not game.step(action)
+        truncated = (not terminated and self.max_frames is not None
+                     and game.frame >= self.max_frames)
+        info = {'score': game.score, 'death_cause': game.death_cause}
+        return self._observe(), game.score - score, terminated, truncated, info
+
+    def _observe(self):
+        observe(self.game, self.observation)
+        if self.pixels is None:
+            return self.observation
+        if self.rasterizer is not None:
+            self.rasterizer.render([self.game], self.frames)
+        else:
+            self.paint(self.tile, self.game)
+        return self.observation, self.pixels
+
+
+class VecEnv:
+    """K games stepped together, each reset as soon as its episode ends.
+
+    Game i starts on course seed + i and every reset moves on to the next
+    unused seed. step() returns arrays with one row per game; when a game ends
+    its row of the observation already belongs to the new episode, and the
+    finished episode's score is in info['score'].
+    """
+
+    def __init__(self, count, seed=None, shape='square', physics=PHYSICS, pixels=False,
+                 max_frames=None):
+        self.count = count
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.next_seed = self.seed
+        self.rngs = [random.Random() for _ in range(count)]
+        self.games = [Game(rng, shape, physics) for rng in self.rngs]
+        self.seeds = np.zeros(count, dtype=np.int64)
+        self.max_frames = max_frames
+        self.observations = np.zeros((count, OBSERVATION_SIZE))
+        self.rewards = np.zeros(count)
+        self.terminated = np.zeros(count, dtype=bool)
+        self.truncated = np.zeros(count, dtype=bool)
+        self.scores = np.zeros(count, dtype=np.int64)
+        self.pixels = self.rasterizer = None
+        if isinstance(pixels, tuple):
+            self.rasterizer = Rasterizer(*pixels)
+            self.pixels = np.zeros((count, pixels[1], pixels[0]), dtype=np.uint8)
+        elif pixels:
+            self.surface, self.tiles, self.pixels = _pixel_surface(count)
+            from .render import paint_game
+            self.paint = paint_game
+
+    def reset(self, seed=None):
+        """Restart every game and return (observations, info)."""
+        if seed is not None:
+            self.seed = self.next_seed = seed
+        for i in range(self.count):
+            self._reset_game(i)
+        return self._observe(range(self.count)), {'seed': self.seeds}
+
+    def step(self, actions):
+        """Advance every game one frame; actions[i] flaps game i.
+
+        Returns (observations, rewards, terminated, truncated, info).
+        """
+        games = self.games
+        observations = self.observations
+        rewards = self.rewards
+        terminated = self.terminated
+        truncated = self.truncated
+        scores = self.scores
+        max_frames = self.max_frames
+        for i, game in enumerate(games):
+            score = game.score
+            ended = not game.step(actions[i])
+            rewards[i] = game.score - score
+            scores[i] = game.score
+            terminated[i] = ended
+            truncated[i] = not ended and max_frames is not None and game.frame >= max_frames
+            if ended or truncated[i]:
+                self._reset_game(i)
+            observe(game, observations[i])
+        if self.pixels is not None:
+            self._draw(range(self.count))
+            observations = observations, self.pixels
+        return observations, rewards, terminated, truncated, {'score': scores, 'seed': self.seeds}
+
+    def _reset_game(self, i):
+        self.seeds[i] = self.next_seed
+        self.next_seed += 1
+        self.rngs[i].seed(int(self.seeds[i]))
+        self.games[i].reset()
+
+    def _observe(self, indexes):
+        for i in indexes:
+            observe(self.games[i], self.observations[i])
+        if self.pixels is None:
+            return self.observations
+        self._draw(indexes)
+        return self.observations, self.pixels
+
+    def _draw(self, indexes):
+        if self.rasterizer is not None:
+            # Every game is redrawn in one batch either way
+            self.rasterizer.render(self.games, self.pixels)
+            return
+        paint = self.paint
+        for i in indexes:
+            paint(self.tiles[i], self.games[i])
@@ -0,0 +1,236 @@
+"""Event-driven simulation of games whose inputs are fixed in advance.
+
+Between two flaps the bird follows a parabola, y + n * v + g * n * (n + 1) / 2
+after n frames, and the pipes move in a straight line, so a replay or a
+solver's candidate input has no need to be played frame by frame. play()
+cuts the input into stretches at the events that change the rules of motion:
+a flap, a pipe spawning, the oldest pipe leaving and the ceiling stopping
+the bird. The first ground, ceiling or pipe collision of a stretch is found
+from the closed form, and the pipes and the score are moved across the
+whole stretch at once.
+
+The game ends exactly as Game.step() would leave it, bit for bit. Positions
+and velocities in the engine are whole multiples of a small power of two (see
+courses.py), so the sums step() adds up frame by frame and the closed form
+here are both exact. Games whose physics or state are not, and swept games,
+are played with step() instead.
+"""
+import math
+from fractions import Fraction
+
+from .core import begin_stretch, move_pipes
+
+# The closed form is exact for values that are multiples of 2**-UNIT_BITS
+# smaller than LIMIT, over stretches of up to MAX_STRETCH frames
+UNIT_BITS = 16
+LIMIT = 2 ** 20
+MAX_STRETCH = 1024
+
+
+def exact(game):
+    """Whether play() can use the closed form on game."""
+    gravity, jump_speed, pipe_gap, pipe_speed = game.physics
+    bird = game.bird
+    values = (gravity, jump_speed, pipe_speed, game.rules.spawn_x, bird.x, bird.y, bird.velocity)
+    return (gravity > 0 and not game.swept
+            and all(Fraction(value).denominator <= 1 << UNIT_BITS and abs(value) < LIMIT
+                    for value in values))
+
+
+class Fall:
+    """The bird's heights over a stretch without a flap, frame 0 at its start."""
+
+    __slots__ = ('y', 'velocity', 'gravity')
+
+    def __init__(self, y, velocity, gravity):
+        self.y = y
+        self.velocity = velocity
+        self.gravity = gravity
+
+    def at(self, n):
+        return self.y + n * self.velocity + self.gravity * (n * (n + 1) // 2)
+
+    def velocity_at(self, n):
+        return self.velocity + n * self.gravity
+
+    def lowest(self, a, b):
+        """The frame in [a, b] with the smallest height."""
+        # Heights fall while velocity_at(n + 1) < 0; the guess can be a
+        # frame out from float division, the adjustment is exact
+        velocity_at = self.velocity_at
+        n = min(max(math.ceil(-self.velocity / self.gravity) - 1, a), b)
+        while n > a and velocity_at(n) >= 0:
+            n -= 1
+        while n < b and velocity_at(n + 1) < 0:
+            n += 1
+        return n
+
+    def first_below(self, a, b, height):
+        """First frame in [a, b] with a height below height, or None."""
+        low = self.lowest(a, b)
+        if self.at(low) >= height:
+            return None
+        # Heights only fall up to the lowest frame
+        while a < low:
+            middle = (a + low) // 2
+            if self.at(middle) < height:
+                low = middle
+            else:
+                a = middle + 1
+        return low
+
+    def first_grounded(self, a, b, grounded):
+        """First frame in [a, b] on which grounded(height) holds, or None.
+
+        grounded must be monotone in the height, so the frames it holds on are
+        a run at the start of [a, b], one at the end, or both.
+        """
+        if a > b:
+            return None
+        if grounded(self.at(a)):
+            return a
+        if not grounded(self.at(b)):
+            return None
+        while b - a > 1:
+            middle = (a + b) // 2
+            if grounded(self.at(middle)):
+                b = middle
+            else:
+                a = middle
+        return b
+
+
+def _pipe_hit(game, fall, clamp, pipe, a, b):
+    """First frame in [a, b] on which the bird overlaps pipe, or None.
+
+    Frames are ruled out a range at a time: a range is only split while the
+    bird's box over all of it can reach the pipe. Single frames get the same
+    Pipe.collides_with test as step().
+    """
+    bird = game.bird
+    rules = game.rules
+    speed = game.physics.pipe_speed
+    offset = bird.offset
+    size = bird.size
+    truncate = bird.truncate
+    left = bird.x + offset
+    if truncate:
+        left = int(left)
+    pipe_left = pipe.x + rules.pipe_offset
+    pipe_right = pipe_left + rules.pipe_width
+    top = pipe.height - pipe.gap
+    height = pipe.height
+    bottom = rules.pipe_bottom
+    extents = bird.extents
+    ranges = [(a, b)]
+    while ranges:
+        a, b = ranges.pop()
+        # Against the pipe where it stands now, the bird moves right instead
+        if left + speed * a >= pipe_right or left + speed * b + size <= pipe_left:
+            continue
+        # The clamped frame sits above the parabola, so the parabola's lowest
+        # point still bounds the range from above
+        low = fall.at(fall.lowest(a, b)) + offset
+        high = max(0 if a == clamp else fall.at(a), 0 if b == clamp else fall.at(b)) + offset
+        if truncate:
+            low = int(low)
+            high = int(high)
+        if not ((top > 0 and low < top and high + size > 0)
+                or (high + size > height and low < bottom)):
+            continue
+        if a == b:
+            y = (0 if a == clamp else fall.at(a)) + offset
+            rect = (left + speed * a, int(y) if truncate else y, size, size)
+            if pipe.collides_with(rect, extents, rules):
+                return a
+            continue
+        middle = (a + b) // 2
+        # Earlier half on top, so the first hit is found first
+        ranges.append((middle + 1, b))
+        ranges.append((a, middle))
+    return None
+
+
+def _stretch(game, action, frames):
+    """Play up to frames frames without a flap after the first; returns how many."""
+    rules = game.rules
+    gravity, jump_speed, pipe_gap, pipe_speed = game.physics
+    frames = min(begin_stretch(game, frames), MAX_STRETCH)
+    bird = game.bird
+    velocity = bird.velocity
+    if action:
+        velocity = rules.jump(velocity, jump_speed)
+    fall = Fall(bird.y, velocity, gravity)
+
+    # A clamped ceiling stops the bird and ends the stretch there
+    clamp = None
+    ceiling = fall.first_below(1, frames, 0)
+    if ceiling is not None and rules.clamp_ceiling:
+        clamp = frames = ceiling
+        ceiling = None
+    death = fall.first_grounded(1, frames if clamp is None else frames - 1, rules.grounded)
+    cause = 'ground' if death is not None else None
+    if ceiling is not None and (death is None or ceiling < death):
+        death = ceiling
+        cause = 'ceiling'
+
+    # Pipe deaths take precedence on the same frame, as in Game._end
+    played = frames if death is None else death
+    hit = None
+    # Only pipes whose span over the stretch reaches the bird's column
+    start = bird.get_rect()[0] - game.pipe_shift
+    for pipe in game.pipes.overlapping(start, start + bird.size + played * pipe_speed,
+                                       game.pipe_half):
+        found = _pipe_hit(game, fall, clamp, pipe, 1, played if hit is None else hit - 1)
+        if found is not None:
+            hit = found
+    if hit is not None:
+        played = hit
+        cause = 'pipe'
+
+    if played == clamp:
+        bird.y = bird.velocity = 0
+    else:
+        bird.y = fall.at(played)
+        bird.velocity = fall.velocity_at(played)
+    game.frame += played
+    game.score += move_pipes(game, played)
+    if hit is None and rules.respawn:
+        # A pipe respawned on the last frame was not there to be searched
+        rect = bird.get_rect()
+        if any(pipe.collides_with(rect, bird.extents, rules) for pipe in game.pipes):
+            cause = 'pipe'
+    if cause:
+        game._end(cause)
+    return played
+
+
+def play(game, flaps, frames=None):
+    """Advance game by frames frames, or until it ends, flapping on flaps.
+
+    flaps are the frames to flap on, counted from 0 at the game's current
+    frame and in increasing order: the indices of the true actions in the
+    list step() would be called with. Returns whether the game is still
+    active.
+    """
+    start = game.frame
+    end = math.inf if frames is None else start + frames
+    if not exact(game):
+        flaps = set(flaps)
+        step = game.step
+        while game.frame < end and step(game.frame - start in flaps):
+            pass
+        return game.game_active
+    flaps = iter(flaps)
+    next_flap = start + next(flaps, math.inf)
+    while game.game_active and game.frame < end:
+        action = game.frame == next_flap
+        if action:
+            following = start + next(flaps, math.inf)
+            if following <= next_flap:
+                raise ValueError('flap frames must be increasing')
+            next_flap = following
+        elif next_flap < game.frame:
+            raise ValueError('flap frames must be increasing')
+        _stretch(game, action, min(next_flap, end) - game.frame)
+    return game.game_active
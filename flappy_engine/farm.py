@@ -0,0 +1,147 @@
+"""Evaluate bot controllers over many seeded courses on every core.
+
+(controller, seed) episodes are sharded into chunks across a
+ProcessPoolExecutor. Workers are started once and reused, importing the engine
+and resolving controllers a single time, and each finished chunk's episode
+results are yielded as soon as it completes.
+
+Usage:
+    python -m flappy_engine.farm flappy_engine.controllers:gap_follower \\
+        --seeds 0:10000 [--workers 64] [--rules o3mini] [--jsonl results.jsonl]
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .core import RULES, Game
+from .variants import VARIANTS
+
+EpisodeResult = namedtuple('EpisodeResult',
+                           ['controller', 'seed', 'score', 'frames', 'death_cause'])
+
+# Episodes still alive after this many frames are cut off with death_cause None
+MAX_FRAMES = 100000
+
+_controllers = {}
+
+
+def resolve(spec):
+    """Load the controller named by a 'module:attribute' spec, cached per process."""
+    controller = _controllers.get(spec)
+    if controller is None:
+        module_name, _, attr = spec.partition(':')
+        controller = getattr(importlib.import_module(module_name), attr)
+        _controllers[spec] = controller
+    return controller
+
+
+def run_episode(spec, seed, shape='square', physics=None, max_frames=MAX_FRAMES, rules=RULES,
+                swept=False, frame_skip=1):
+    """Play one episode; the controller decides every frame_skip frames."""
+    controller = resolve(spec)
+    if isinstance(controller, type):
+        controller = controller()
+    game = Game(random.Random(seed), shape, physics, rules=rules, swept=swept)
+    if frame_skip > 1:
+        advance = game.advance
+        while game.frame < max_frames and advance(frame_skip, controller(game)):
+            pass
+    else:
+        step = game.step
+        while game.frame < max_frames and step(controller(game)):
+            pass
+    return EpisodeResult(spec, seed, game.score, game.frame, game.death_cause)
+
+
+def _warm(specs):
+    # Runs once per worker: resolve every controller up front
+    for spec in specs:
+        resolve(spec)
+
+
+def _run_chunk(jobs, options):
+    return [run_episode(spec, seed, **options) for spec, seed in jobs]
+
+
+def evaluate(specs, seeds, workers=None, chunksize=64, **options):
+    """Yield an EpisodeResult for every (controller, seed) pair as chunks finish.
+
+    options are passed on to run_episode. Results arrive in completion
+    order, not submission order.
+    """
+    specs = list(specs)
+    jobs = [(spec, seed) for seed in seeds for spec in specs]
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers, initializer=_warm, initargs=(specs,)) as pool:
+        # Keep a bounded number of chunks in flight so results stream back
+        # while the rest of the jobs are still queued
+        pending = set()
+        chunk_iter = iter(chunks)
+        for chunk in chunk_iter:
+            pending.add(pool.submit(_run_chunk, chunk, options))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = next(chunk_iter, None)
+                if chunk is not None:
+                    pending.add(pool.submit(_run_chunk, chunk, options))
+                yield from future.result()
+
+
+def parse_seeds(text):
+    """'N' for seeds 0..N-1 or 'START:STOP' for a range."""
+    start, _, stop = text.rpartition(':')
+    return range(int(start or 0), int(stop))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score controllers over many seeded courses')
+    parser.add_argument('controllers', nargs='+', help="'module:attribute' of each controller")
+    parser.add_argument('--seeds', type=parse_seeds, default=range(1000))
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunksize', type=int, default=64)
+    parser.add_argument('--shape', default='square')
+    parser.add_argument('--rules', choices=sorted(VARIANTS), default=RULES.name,
+                        help="which implementation's rules to play")
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES)
+    parser.add_argument('--swept', action='store_true',
+                        help='test pipe collisions continuously between frames')
+    parser.add_argument('--frame-skip', type=int, default=1, metavar='K',
+                        help='ask the controllers every K frames; fastest with --swept')
+    parser.add_argument('--jsonl', help='stream every episode result to this file')
+    args = parser.parse_args(argv)
+
+    totals = {spec: [0, 0] for spec in args.controllers}
+    start = time.perf_counter()
+    out = open(args.jsonl, 'w') if args.jsonl else None
+    try:
+        results = evaluate(args.controllers, args.seeds, args.workers, args.chunksize,
+                           shape=args.shape, max_frames=args.max_frames,
+                           rules=VARIANTS[args.rules], swept=args.swept,
+                           frame_skip=args.frame_skip)
+        for result in results:
+            totals[result.controller][0] += 1
+            totals[result.controller][1] += result.score
+            if out:
+                out.write(json.dumps(result._asdict()) + '\n')
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    episodes = sum(count for count, _ in totals.values())
+    for spec, (count, score) in totals.items():
+        print(f'{spec}: {count} episodes, mean score {score / max(count, 1):.2f}')
+    print(f'{episodes} episodes in {elapsed:.2f}s ({episodes / elapsed:.0f}/s)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
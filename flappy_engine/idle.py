@@ -0,0 +1,62 @@
+"""Blocking waits for the pygame front-ends while nothing on screen moves.
+
+A game loop paced by Clock.tick() wakes up 60 times a second whether there
+is anything to do or not. On the game-over screen, and while the window is
+in the background, the games would only redraw the same frame. IdleWait puts
+the loop to sleep in pygame.event.wait() until an event arrives instead. The
+event is put back on the queue for the loop to handle as usual, so SPACE
+restarts with no delay, and frame pacing carries on from there.
+
+The window counts as unfocused only once it has had the keyboard focus and
+lost it, so drivers without a real window (SDL's dummy driver) never pause.
+A game is paused while unfocused, and the time it spends waiting is left out
+of startup.get_ticks() so that millisecond timers resume where they stopped.
+"""
+import time
+
+import pygame
+
+from . import startup
+
+# Longest single wait; focus and idleness are rechecked after each one
+IDLE_TIMEOUT_MS = 250
+
+
+class IdleWait:
+    """Call once per frame with whether the game is idle, between two frames.
+
+    clock, if given, is ticked after a wait so the wait isn't measured as
+    one long frame.
+    """
+
+    def __init__(self, clock=None, timeout=IDLE_TIMEOUT_MS):
+        self.clock = clock
+        self.timeout = timeout
+        self.had_focus = False
+        # Nothing is on screen before the first frame is drawn
+        self.drawn = False
+
+    def unfocused(self):
+        focused = pygame.key.get_focused()
+        self.had_focus = self.had_focus or focused
+        return self.had_focus and not focused
+
+    def __call__(self, idle=False):
+        """Block until an event arrives if idle or unfocused; returns whether it did."""
+        if not self.drawn:
+            self.drawn = True
+            return False
+        if not (idle or self.unfocused()) or pygame.event.peek():
+            return False
+        start = time.perf_counter()
+        while True:
+            event = pygame.event.wait(self.timeout)
+            if event.type != pygame.NOEVENT:
+                pygame.event.post(event)
+                break
+            if not (idle or self.unfocused()):
+                break
+        startup.pause_ticks(time.perf_counter() - start)
+        if self.clock is not None:
+            self.clock.tick()
+        return True
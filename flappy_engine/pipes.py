@@ -0,0 +1,116 @@
+"""Fixed-capacity ring buffer of pipe records.
+
+Pipes are spawned at the right edge and expire at the left in the same order,
+so the live pipes always form one run of the ring: spawning writes the slot
+after the newest pipe and expiry advances the head, both O(1). Slots are
+recycled through the record's reset() instead of being reallocated, and
+nothing is copied or rebuilt per frame.
+
+Every record is stored twice, at slot and slot + capacity, so the live run is
+always the contiguous range records[head:head + count] and hot loops can walk
+it without wrapping indexes.
+
+Because the pipes are also sorted by x and scroll together, a cursor marks the
+first pipe the bird has not yet passed. Scoring advances it, and the only
+pipes that can touch the bird are the few on either side of it, so collision
+never has to look at the rest of the course.
+"""
+from itertools import islice
+
+
+class PipeRing:
+    __slots__ = ('factory', 'capacity', 'records', 'head', 'count', 'cursor')
+
+    def __init__(self, capacity, factory):
+        """factory(*args) builds a record; record.reset(*args) reuses one."""
+        self.factory = factory
+        self.capacity = capacity
+        self.records = [None] * (2 * capacity)
+        self.head = 0
+        self.count = 0
+        # Live index of the first pipe not yet passed
+        self.cursor = 0
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        return islice(self.records, self.head, self.head + self.count)
+
+    def __getitem__(self, index):
+        """index-th oldest live pipe; negative indexes count from the newest."""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('pipe index out of range')
+        return self.records[self.head + index]
+
+    def spawn(self, *args):
+        """Add a pipe after the newest one and return its record."""
+        if self.count == self.capacity:
+            self._grow()
+        slot = (self.head + self.count) % self.capacity
+        record = self.records[slot]
+        if record is None:
+            record = self.factory(*args)
+            self.records[slot] = self.records[slot + self.capacity] = record
+        else:
+            record.reset(*args)
+        self.count += 1
+        return record
+
+    def expire(self):
+        """Drop the oldest pipe."""
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        self.count -= 1
+        if self.cursor:
+            self.cursor -= 1
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.cursor = 0
+
+    def advance(self, x):
+        """Mark pipes left of x as passed and return how many were new."""
+        records = self.records
+        start = cursor = self.head + self.cursor
+        end = self.head + self.count
+        while cursor < end and records[cursor].x < x:
+            records[cursor].passed = True
+            cursor += 1
+        self.cursor = cursor - self.head
+        return cursor - start
+
+    def overlapping(self, left, right, half_width):
+        """Pipes whose [x - half_width, x + half_width) overlaps [left, right).
+
+        Walks outwards from the cursor and stops at the first pipe clear of
+        the span on each side.
+        """
+        records = self.records
+        head = self.head
+        i = head + self.cursor - 1
+        while i >= head and records[i].x + half_width > left:
+            if records[i].x - half_width < right:
+                yield records[i]
+            i -= 1
+        i = head + self.cursor
+        end = head + self.count
+        while i < end and records[i].x - half_width < right:
+            if records[i].x + half_width > left:
+                yield records[i]
+            i += 1
+
+    def _grow(self):
+        # Only hit when a stress mode outruns the capacity; the ring is full,
+        # so every record is live and is moved to the front in order
+        live = list(self)
+        self.capacity = max(2 * self.capacity, 1)
+        self.records = (live + [None] * (self.capacity - len(live))) * 2
+        self.head = 0
@@ -0,0 +1,212 @@
+"""Per-phase frame timings in a fixed ring buffer, with an on-screen overlay.
+
+The game loop calls mark(phase) as each phase of a frame ends and
+end_frame() once the frame is over. Each mark charges the time since the
+previous one to that phase, so phases that run several times a frame (update
+and collision inside the fixed-step loop) add up. The last capacity frames
+are kept in a preallocated array; nothing is allocated per frame.
+
+A disabled profiler's mark and end_frame are a do-nothing function, so the
+calls can stay in the loop. Enabling it swaps the real methods in.
+
+dump() writes the buffered frames oldest first, as CSV or, for a .json path,
+as JSON with a per-phase summary. A frame that took more than one and a half
+frame budgets counts as dropped, and jitter is the standard deviation of the
+frame times.
+"""
+import csv
+import json
+import time
+from array import array
+
+PHASES = ('events', 'update', 'collision', 'draw', 'flip', 'idle')
+EVENTS, UPDATE, COLLISION, DRAW, FLIP, IDLE = range(len(PHASES))
+
+# Ten seconds at 60 fps
+CAPACITY = 600
+
+OVERLAY_WIDTH = 200
+OVERLAY_GRAPH_HEIGHT = 40
+# Overlay text is re-rendered this often rather than every frame
+OVERLAY_REFRESH = 15
+
+PHASE_COLORS = [
+    (90, 90, 220),  # events
+    (40, 160, 40),  # update
+    (220, 140, 0),  # collision
+    (200, 40, 40),  # draw
+    (160, 40, 160),  # flip
+    (140, 140, 140),  # idle
+]
+
+
+def _ignore(*args):
+    pass
+
+
+class FrameProfiler:
+    def __init__(self, fps=60, capacity=CAPACITY, enabled=False):
+        self.fps = fps
+        self.budget = 1 / fps
+        self.capacity = capacity
+        # One row of len(PHASES) durations plus the frame total per frame
+        self.width = len(PHASES) + 1
+        self.samples = array('d', bytes(8 * self.width * capacity))
+        self.frames = 0
+        self.dropped = 0
+        self.row = 0
+        self.last = self.frame_start = time.perf_counter()
+        self.enabled = enabled
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled):
+        self._enabled = enabled
+        if enabled:
+            # Start the next frame from now, not from when it was last on
+            self.last = self.frame_start = time.perf_counter()
+            self.mark = self._mark
+            self.end_frame = self._end_frame
+        else:
+            self.mark = self.end_frame = _ignore
+
+    def _mark(self, phase):
+        now = time.perf_counter()
+        self.samples[self.row + phase] += now - self.last
+        self.last = now
+
+    def _end_frame(self):
+        now = time.perf_counter()
+        samples = self.samples
+        row = self.row
+        total = samples[row + len(PHASES)] = now - self.frame_start
+        if total > 1.5 * self.budget:
+            self.dropped += 1
+        self.frames += 1
+        self.row = row = self.frames % self.capacity * self.width
+        for index in range(row, row + self.width):
+            samples[index] = 0.0
+        self.last = self.frame_start = now
+
+    def rows(self, count=None):
+        """The last count buffered frames (all by default), oldest first.
+
+        Each is (frame number, phase durations followed by the total).
+        """
+        count = min(self.frames, self.capacity, self.capacity if count is None else count)
+        first = self.frames - count
+        width = self.width
+        for frame in range(first, self.frames):
+            row = frame % self.capacity * width
+            yield frame, self.samples[row:row + width].tolist()
+
+    def jitter(self, count=None):
+        """Standard deviation of the last count frame times, in seconds."""
+        totals = [row[-1] for _, row in self.rows(count)]
+        if len(totals) < 2:
+            return 0.0
+        mean = sum(totals) / len(totals)
+        return (sum((total - mean) ** 2 for total in totals) / (len(totals) - 1)) ** 0.5
+
+    def summary(self):
+        """Mean and worst milliseconds per phase over the buffered frames."""
+        totals = [0.0] * self.width
+        worst = [0.0] * self.width
+        count = 0
+        for _, row in self.rows():
+            count += 1
+            for index, value in enumerate(row):
+                totals[index] += value
+                worst[index] = max(worst[index], value)
+        names = PHASES + ('total',)
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'jitter_ms': round(self.jitter() * 1000, 4),
+            'phases': {name: {'mean_ms': round(totals[i] / max(count, 1) * 1000, 4),
+                              'max_ms': round(worst[i] * 1000, 4)}
+                       for i, name in enumerate(names)},
+        }
+
+    def dump(self, path):
+        """Write the buffered frames to path, as JSON if it ends in .json, else CSV."""
+        header = ['frame'] + [f'{name}_ms' for name in PHASES + ('total',)]
+        records = [[frame] + [round(value * 1000, 4) for value in row]
+                   for frame, row in self.rows()]
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.json'):
+                json.dump({'fps': self.fps, 'summary': self.summary(),
+                           'columns': header, 'frames': records}, f)
+                f.write('\n')
+            else:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(records)
+
+
+class ProfilerOverlay:
+    """Frame-time graph and phase breakdown drawn in a corner of the screen.
+
+    Bars are stacked per phase for the most recent frames, with a line at the
+    frame budget. The text is refreshed every OVERLAY_REFRESH frames.
+    """
+
+    def __init__(self, profiler, font, position=(10, 10)):
+        self.profiler = profiler
+        self.font = font
+        self.x, self.y = position
+        self.lines = []
+        self.refreshed = None
+
+    def _refresh(self):
+        profiler = self.profiler
+        recent = list(profiler.rows(OVERLAY_REFRESH))
+        count = max(len(recent), 1)
+        means = [sum(row[i] for _, row in recent) / count * 1000
+                 for i in range(len(PHASES) + 1)]
+        # Labels on the left, milliseconds right-aligned
+        text = [(f'frame  dropped {profiler.dropped}', means[-1], (0, 0, 0)),
+                ('jitter', profiler.jitter(OVERLAY_WIDTH) * 1000, (0, 0, 0))]
+        text += [(name, means[i], PHASE_COLORS[i]) for i, name in enumerate(PHASES)]
+        render = self.font.render
+        self.lines = [(render(label, True, color), render(f'{ms:.2f} ms', True, color))
+                      for label, ms, color in text]
+        self.refreshed = profiler.frames
+
+    def draw(self, surface):
+        """Draw onto surface; returns the rect it covers."""
+        profiler = self.profiler
+        if self.refreshed is None or profiler.frames - self.refreshed >= OVERLAY_REFRESH:
+            self._refresh()
+        x, y = self.x, self.y
+        line_height = self.font.get_linesize()
+        height = OVERLAY_GRAPH_HEIGHT + 4 + line_height * len(self.lines)
+        rect = surface.fill((255, 255, 255), (x, y, OVERLAY_WIDTH, height))
+
+        # One column per frame, newest on the right, two budgets tall
+        samples = profiler.samples
+        width = profiler.width
+        scale = OVERLAY_GRAPH_HEIGHT / (2 * profiler.budget)
+        bottom = y + OVERLAY_GRAPH_HEIGHT
+        first = max(profiler.frames - min(OVERLAY_WIDTH, profiler.capacity), 0)
+        column = x + OVERLAY_WIDTH - (profiler.frames - first)
+        for frame in range(first, profiler.frames):
+            row = frame % profiler.capacity * width
+            top = bottom
+            for phase in range(len(PHASES)):
+                size = int(samples[row + phase] * scale)
+                if size and top > y:
+                    start = max(top - size, y)
+                    surface.fill(PHASE_COLORS[phase], (column, start, 1, top - start))
+                    top = start
+            column += 1
+        surface.fill((0, 0, 0), (x, bottom - OVERLAY_GRAPH_HEIGHT // 2, OVERLAY_WIDTH, 1))
+
+        for label, value in self.lines:
+            surface.blit(label, (x + 4, bottom + 4))
+            surface.blit(value, (x + OVERLAY_WIDTH - 4 - value.get_width(), bottom + 4))
+            bottom += line_height
+        return rect
@@ -0,0 +1,138 @@
+"""Low-resolution grayscale frames of many games, rendered in NumPy alone.
+
+The scene render.paint_game draws (sky, pipes, bird, ground) is made only of
+axis-aligned rectangles, a row span per bird row and a rect per pipe. The
+frame is downsampled with a box filter: every target pixel is the mean of the
+source pixels it covers. That filter is separable, so a rectangle's
+contribution to the small frame is the outer product of its row and column
+coverage. Those come from cumulative weight tables in two lookups, and no
+full-size frame is ever drawn.
+
+Each rectangle adds the difference between its gray level and the sky's on
+top of a precomputed background. The pipes never overlap each other. Where
+the bird covers a pipe, a correction removes the pipe's share, so painting
+order is respected. A whole batch of games is then summed with a single
+batched matrix product.
+
+The result is the box-filtered luma (ITU-R 601) of the exact frame
+paint_game draws, rounded to uint8, for any target size. pygame is not used.
+"""
+import numpy as np
+
+from .core import (BACKGROUND_COLOR, BIRD_COLOR, BIRD_SHAPES, BIRD_SIZE, GROUND_COLOR,
+                   GROUND_Y, PIPE_WIDTH, WINDOW_HEIGHT, WINDOW_WIDTH, check_rules,
+                   shape_spans)
+
+
+def luma(color):
+    r, g, b = color[:3]
+    return 0.299 * r + 0.587 * g + 0.114 * b
+
+
+def box_weights(source, target):
+    """Cumulative box-filter weights, shaped (source + 1, target).
+
+    Row x holds, for every target pixel, the fraction of it covered by source
+    pixels [0, x), so the coverage of [x0, x1) is weights[x1] - weights[x0].
+    """
+    scale = source / target
+    edges = np.arange(source + 1)[:, None]
+    starts = np.arange(target)[None, :] * scale
+    return np.clip(edges - starts, 0, scale) / scale
+
+
+class Rasterizer:
+    """Renders lists of core.Game into (count, height, width) uint8 frames.
+
+    The games must play the default rules, as for render.paint_game.
+    """
+
+    def __init__(self, width=84, height=84, bird_color=BIRD_COLOR,
+                 background_color=BACKGROUND_COLOR, ground_color=GROUND_COLOR):
+        self.width = width
+        self.height = height
+        self.columns = box_weights(WINDOW_WIDTH, width)
+        self.rows = box_weights(WINDOW_HEIGHT, height)
+        self.sky = luma(background_color)
+        self.bird_delta = luma(bird_color) - self.sky
+        ground = self.rows[WINDOW_HEIGHT] - self.rows[GROUND_Y]
+        self.background = self.sky + (luma(ground_color) - self.sky) * np.outer(
+            ground, self.columns[WINDOW_WIDTH] - self.columns[0])
+        # Bird spans for every shape, (shape, row, start/stop)
+        self.spans = np.array([shape_spans(shape) for shape in BIRD_SHAPES])
+        self.shape_index = {shape: i for i, shape in enumerate(BIRD_SHAPES)}
+        self._gray = {}
+
+    def render(self, games, out=None):
+        """Draw every game; returns out, allocated if not given."""
+        count = len(games)
+        if out is None:
+            out = np.empty((count, self.height, self.width), dtype=np.uint8)
+        if not count:
+            return out
+        slots = max(len(game.pipes) for game in games)
+
+        # Gather the few numbers each game contributes; everything after this
+        # loop is vectorized over the batch
+        bird = np.empty((count, 2), dtype=np.int64)
+        shapes = np.empty(count, dtype=np.int64)
+        # Top and bottom pipe rects as (x0, x1, y0, y1), with their gray delta
+        pipes = np.zeros((count, 2 * slots, 4), dtype=np.int64)
+        deltas = np.zeros((count, 2 * slots))
+        # The one pipe (top and bottom) that can sit under the bird
+        under = np.zeros((count, 2, 4), dtype=np.int64)
+        under_deltas = np.zeros((count, 2))
+        gray = self._gray
+        for i, game in enumerate(games):
+            check_rules(game, 'Rasterizer')
+            bx, by, _, _ = game.bird.get_rect()
+            bird[i] = bx, by
+            shapes[i] = self.shape_index[game.bird.shape]
+            bird_left, bird_right = bx, bx + BIRD_SIZE
+            for j, pipe in enumerate(game.pipes):
+                left = pipe.x - 30
+                delta = gray.get(pipe.color)
+                if delta is None:
+                    delta = gray[pipe.color] = luma(pipe.color) - self.sky
+                pipes[i, 2 * j] = left, left + PIPE_WIDTH, 0, pipe.height - pipe.gap
+                pipes[i, 2 * j + 1] = left, left + PIPE_WIDTH, pipe.height, WINDOW_HEIGHT
+                deltas[i, 2 * j:2 * j + 2] = delta
+                # Pipes are spawned further apart than a pipe and a bird are
+                # wide, so at most one overlaps the bird's columns
+                if left < bird_right and left + PIPE_WIDTH > bird_left:
+                    under[i] = pipes[i, 2 * j:2 * j + 2]
+                    under_deltas[i] = -delta
+
+        # One rect per bird row
+        spans = self.spans[shapes]
+        row_y = bird[:, 1:2] + np.arange(BIRD_SIZE)
+        rows = np.stack([bird[:, :1] + spans[:, :, 0], bird[:, :1] + spans[:, :, 1],
+                         row_y, row_y + 1], axis=-1)
+        # and its intersection with the pipe under it, cancelling the pipe there
+        overlap = np.concatenate([
+            np.maximum(rows[:, :, None, 0::2], under[:, None, :, 0::2]),
+            np.minimum(rows[:, :, None, 1::2], under[:, None, :, 1::2]),
+        ], axis=-1)[..., [0, 2, 1, 3]].reshape(count, -1, 4)
+        rects = np.concatenate([pipes, rows, overlap], axis=1)
+        weights = np.concatenate([
+            deltas,
+            np.broadcast_to(self.bird_delta, (count, BIRD_SIZE)),
+            np.tile(under_deltas, (1, BIRD_SIZE)),
+        ], axis=1)
+        return self._compose(rects, weights, out)
+
+    def _compose(self, rects, weights, out):
+        # Everything is drawn inside the playfield, so clip to it. Clipping
+        # keeps x0 <= x1 once empty rects are collapsed.
+        x0 = np.clip(rects[..., 0], 0, WINDOW_WIDTH)
+        x1 = np.clip(np.maximum(rects[..., 1], rects[..., 0]), 0, WINDOW_WIDTH)
+        y0 = np.clip(rects[..., 2], 0, GROUND_Y)
+        y1 = np.clip(np.maximum(rects[..., 3], rects[..., 2]), 0, GROUND_Y)
+        columns = self.columns[x1] - self.columns[x0]
+        rows = (self.rows[y1] - self.rows[y0]) * weights[..., None]
+        frames = np.matmul(rows.transpose(0, 2, 1), columns)
+        frames += self.background
+        np.rint(frames, out=frames)
+        np.clip(frames, 0, 255, out=frames)
+        out[...] = frames
+        return out
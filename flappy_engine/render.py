@@ -0,0 +1,157 @@
+"""Frame presenters for the pygame front-ends.
+
+Both renderers start every frame from a background surface composited once per
+run (sky and ground), and clip game drawing to the playfield so pipes and the
+bird never have to be painted over by the ground again.
+
+FullRenderer repaints and flips the whole window each frame. DirtyRectRenderer
+erases only what was drawn last frame and pushes just the changed regions with
+pygame.display.update(rects), which is far cheaper on software-rendered
+displays where the full-window copy dominates the frame.
+"""
+import pygame
+
+from .core import (BACKGROUND_COLOR, BIRD_COLOR, GROUND_COLOR, GROUND_Y, WINDOW_HEIGHT,
+                   WINDOW_WIDTH, check_rules, shape_spans)
+from .sprites import bird_sprite
+from .text import render_text
+
+
+def compose_background(size, background_color, ground_color, ground_height):
+    """Sky filled with background_color over a ground strip, display format."""
+    width, height = size
+    background = pygame.Surface(size).convert()
+    background.fill(background_color)
+    pygame.draw.rect(background, ground_color,
+                     (0, height - ground_height, width, ground_height))
+    return background
+
+
+class FullRenderer:
+    def __init__(self, screen, playfield=None):
+        self.screen = screen
+        self.playfield = pygame.Rect(playfield or screen.get_rect())
+        self.background = None
+
+    def set_background(self, background):
+        self.background = background
+
+    def begin(self):
+        """Clear the frame and clip drawing to the playfield."""
+        self.screen.set_clip(None)
+        self.screen.blit(self.background, (0, 0))
+        self.screen.set_clip(self.playfield)
+
+    def mark(self, *rects):
+        """Record regions drawn this frame (the rects pygame.draw/blit return)."""
+
+    def present(self):
+        self.screen.set_clip(None)
+        pygame.display.flip()
+
+
+class DirtyRectRenderer(FullRenderer):
+    def __init__(self, screen, playfield=None):
+        super().__init__(screen, playfield)
+        self.previous = []
+        self.dirty = []
+        self.full_redraw = True
+
+    def set_background(self, background):
+        super().set_background(background)
+        self.full_redraw = True
+
+    def begin(self):
+        if self.full_redraw:
+            super().begin()
+            return
+        # Erase last frame's drawing by restoring the background under it
+        screen = self.screen
+        screen.set_clip(None)
+        background = self.background
+        for rect in self.previous:
+            screen.blit(background, rect, rect)
+        screen.set_clip(self.playfield)
+
+    def mark(self, *rects):
+        self.dirty.extend(rects)
+
+    def present(self):
+        self.screen.set_clip(None)
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            # Old positions must be pushed too, or erased sprites leave trails
+            pygame.display.update(self.previous + self.dirty)
+        self.previous = self.dirty
+        self.dirty = []
+
+
+class GameView:
+    """Draws a headless core.Game in the style of flappy_claude3.5.py.
+
+    Only games played by the default rules have that geometry; others raise
+    ValueError.
+    """
+
+    BACKGROUND_COLOR = BACKGROUND_COLOR
+    GROUND_COLOR = GROUND_COLOR
+    BIRD_COLOR = BIRD_COLOR
+
+    def __init__(self, screen, dirty=False, font=None):
+        self.screen = screen
+        self.width = WINDOW_WIDTH
+        self.height = WINDOW_HEIGHT
+        renderer_class = DirtyRectRenderer if dirty else FullRenderer
+        self.renderer = renderer_class(screen, (0, 0, WINDOW_WIDTH, GROUND_Y))
+        self.renderer.set_background(compose_background(
+            (WINDOW_WIDTH, WINDOW_HEIGHT), self.BACKGROUND_COLOR, self.GROUND_COLOR,
+            WINDOW_HEIGHT - GROUND_Y))
+        self.font = font or pygame.font.Font(None, 36)
+
+    def draw(self, game):
+        check_rules(game, 'GameView')
+        screen = self.screen
+        renderer = self.renderer
+        renderer.begin()
+        for pipe in game.pipes:
+            renderer.mark(
+                pygame.draw.rect(screen, pipe.color,
+                                 (pipe.x - 30, pipe.height, 60, self.height - pipe.height)),
+                pygame.draw.rect(screen, pipe.color,
+                                 (pipe.x - 30, 0, 60, pipe.height - pipe.gap)))
+        image, _ = bird_sprite(game.bird.shape, self.BIRD_COLOR)
+        renderer.mark(screen.blit(image, game.bird.get_rect()))
+        score_text = render_text(self.font, f'Score: {game.score}', True, (0, 0, 0))
+        renderer.mark(screen.blit(score_text, (self.width - 120, 10)))
+        renderer.present()
+
+
+def paint_game(surface, game, bird_color=BIRD_COLOR, background_color=BACKGROUND_COLOR,
+               ground_color=GROUND_COLOR):
+    """Draw game onto surface with Surface.fill alone.
+
+    fill, unlike blit, works on a surface that is locked by a live surfarray
+    view, so this is the drawing path for surfaces whose pixels are handed out
+    as arrays. The bird is filled from the same shape spans its sprite is
+    rasterized from, and the ground goes on last instead of clipping.
+
+    fill moves a rect that starts off the top or left edge onto the surface
+    whole instead of cutting it, so every rect is clipped to the surface first.
+    Like GameView, it only draws games played by the default rules.
+    """
+    check_rules(game, 'paint_game')
+    bounds = surface.get_rect()
+    surface.fill(background_color)
+    for pipe in game.pipes:
+        left = pipe.x - 30
+        surface.fill(pipe.color, bounds.clip(left, pipe.height, 60, WINDOW_HEIGHT - pipe.height))
+        if pipe.height > pipe.gap:
+            surface.fill(pipe.color, bounds.clip(left, 0, 60, pipe.height - pipe.gap))
+    bird = game.bird
+    bx, by, _, _ = bird.get_rect()
+    for row, (start, stop) in enumerate(shape_spans(bird.shape)):
+        if start < stop:
+            surface.fill(bird_color, bounds.clip(bx + start, by + row, stop - start, 1))
+    surface.fill(ground_color, (0, GROUND_Y, WINDOW_WIDTH, WINDOW_HEIGHT - GROUND_Y))
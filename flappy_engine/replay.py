@@ -0,0 +1,201 @@
+"""Compact replays of single games and a player for them.
+
+A replay is everything needed to re-simulate a game exactly: the seed of its
+pipe course, the bird shape, the physics constants, and one bit per frame for
+whether the bird flapped. The binary layout is a fixed header followed by the
+flap bits packed eight frames to a byte, least significant bit first.
+
+Usage:
+    python -m flappy_engine.replay verify FILE...
+    python -m flappy_engine.replay play FILE [--speed 2]
+"""
+import argparse
+import math
+import random
+import struct
+import sys
+import time
+
+from .core import BIRD_SHAPES, PHYSICS, WINDOW_HEIGHT, WINDOW_WIDTH, Game, Physics
+from .events import play as play_flaps
+
+MAGIC = b'FLRP'
+VERSION = 1
+# magic, version, seed, shape, gravity, jump_speed, pipe_gap, pipe_speed,
+# frames, claimed score; pipe gap and speed are whole pixels
+HEADER = struct.Struct('<4sBqB2d2iII')
+
+# Flap bits of every byte value, so unpacking is a table lookup per byte
+_BITS = [tuple(bool(byte >> bit & 1) for bit in range(8)) for byte in range(256)]
+
+
+class ReplayError(ValueError):
+    pass
+
+
+class Replay:
+    def __init__(self, seed, shape='square', physics=PHYSICS, flaps=None, frames=0, score=0):
+        self.seed = seed
+        self.shape = shape
+        self.physics = Physics(*physics)
+        self.flaps = bytearray(flaps or b'')
+        self.frames = frames
+        self.score = score
+
+    def record(self, flap):
+        """Append one frame's input."""
+        if self.frames % 8 == 0:
+            self.flaps.append(0)
+        if flap:
+            self.flaps[-1] |= 1 << (self.frames % 8)
+        self.frames += 1
+
+    def actions(self):
+        """The recorded flap input of every frame, in order."""
+        frames = self.frames
+        for index, byte in enumerate(self.flaps):
+            bits = _BITS[byte]
+            if index * 8 + 8 <= frames:
+                yield from bits
+            else:
+                yield from bits[:frames - index * 8]
+
+    def flap_frames(self):
+        """The frames on which the bird flapped, in order."""
+        for index, byte in enumerate(self.flaps):
+            if byte:
+                base = index * 8
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield base + bit
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, self.seed, BIRD_SHAPES.index(self.shape),
+                             *self.physics, self.frames, self.score)
+        return header + bytes(self.flaps)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ReplayError('truncated replay header')
+        magic, version, seed, shape, *rest = HEADER.unpack_from(data)
+        physics, (frames, score) = rest[:4], rest[4:]
+        if magic != MAGIC:
+            raise ReplayError('not a replay file')
+        if version != VERSION:
+            raise ReplayError(f'unsupported replay version {version}')
+        if shape >= len(BIRD_SHAPES):
+            raise ReplayError(f'unknown bird shape {shape}')
+        gravity, jump_speed, pipe_gap, pipe_speed = physics
+        if not (math.isfinite(gravity) and math.isfinite(jump_speed)
+                and gravity > 0 and pipe_gap > 0 and pipe_speed > 0):
+            raise ReplayError(f'impossible physics {Physics(*physics)}')
+        flaps = data[HEADER.size:]
+        if len(flaps) != (frames + 7) // 8:
+            raise ReplayError('flap data does not match the frame count')
+        return cls(seed, BIRD_SHAPES[shape], physics, flaps, frames, score)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def new_game(replay):
+    return Game(random.Random(replay.seed), replay.shape, replay.physics)
+
+
+def simulate(replay):
+    """Re-simulate a replay headlessly as fast as possible; returns the Game.
+
+    The game jumps from event to event (see events.py) rather than stepping
+    every frame, and ends exactly as stepping would.
+    """
+    game = new_game(replay)
+    play_flaps(game, replay.flap_frames(), replay.frames)
+    return game
+
+
+def verify(replay, physics=PHYSICS):
+    """Whether the replay really scores what it claims.
+
+    The game must end on exactly the last recorded frame, so input past the
+    death (or a game that never ended) is rejected too. A replay recorded
+    with other physics than the game's raises ReplayError: a wider gap or
+    weaker gravity would score without playing the real game.
+    """
+    if replay.physics != physics:
+        raise ReplayError(f"physics {replay.physics} are not the game's {Physics(*physics)}")
+    game = simulate(replay)
+    return (not game.game_active and game.frame == replay.frames
+            and game.score == replay.score)
+
+
+def play(replay, speed=1.0, dirty=False):
+    """Render a replay in a window at speed times real time."""
+    import pygame
+
+    from .render import GameView
+    from .timing import FPS, FixedTimestep
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption('Flappy Bird replay')
+    view = GameView(screen, dirty)
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep(FPS, speed)
+    game = new_game(replay)
+    actions = replay.actions()
+    while game.game_active:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (
+                    event.type == pygame.KEYDOWN and event.key in (pygame.K_ESCAPE, pygame.K_q)):
+                return game
+        for _ in range(timestep.advance(clock.tick(FPS))):
+            if not game.step(next(actions, False)):
+                break
+        view.draw(game)
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Verify or watch Flappy Bird replays')
+    commands = parser.add_subparsers(dest='command', required=True)
+    verify_parser = commands.add_parser('verify', help='re-simulate replays and check their scores')
+    verify_parser.add_argument('files', nargs='+')
+    play_parser = commands.add_parser('play', help='watch a replay')
+    play_parser.add_argument('file')
+    play_parser.add_argument('--speed', type=float, default=1.0, help='playback rate')
+    play_parser.add_argument('--dirty', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.command == 'play':
+        game = play(Replay.load(args.file), args.speed, args.dirty)
+        print(f'score {game.score}')
+        return
+
+    failures = 0
+    start = time.perf_counter()
+    for path in args.files:
+        try:
+            replay = Replay.load(path)
+            ok = verify(replay)
+        except (OSError, ReplayError) as exc:
+            print(f'{path}: error: {exc}')
+            failures += 1
+            continue
+        if not ok:
+            failures += 1
+        print(f"{path}: {'ok' if ok else 'FAILED'} score {replay.score}")
+    elapsed = time.perf_counter() - start
+    print(f'{len(args.files)} replays, {failures} failed, {elapsed:.3f}s', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
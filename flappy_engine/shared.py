@@ -0,0 +1,345 @@
+"""Simulation and rendering in separate processes, through shared memory.
+
+The simulation process steps a Game at a fixed 60 Hz on its own, so a slow
+display flip can never hold up physics. After every step it publishes the
+game's state into a multiprocessing.shared_memory block. Any number of viewer
+processes read the latest state from the block and draw it with GameView at
+their own pace, so one game can feed several attract-mode screens without
+simulating it more than once.
+
+The block holds a small header and two state slots, used as a lock-free
+double buffer. The simulation writes each state into the slot readers are not
+pointed at and then points them at it. Every slot starts with a sequence
+number that is odd while the slot is being written. A reader reads the
+sequence number of the slot the header points at, copies the slot if it is
+even, and keeps the copy only if the number is unchanged afterwards;
+otherwise the writer lapped it and it reads again. Neither side ever waits
+for the other. This relies on each struct.pack_into() landing in memory in
+program order, as it does on x86.
+
+Viewers send SPACE to the simulation by bumping a flap counter in the header,
+which restarts a finished game with the next seed. With --bot the simulation
+plays a controller instead and restarts on its own.
+
+Usage:
+    python -m flappy_engine.shared [--viewers 2] [--bot flappy_engine.controllers:gap_follower]
+    python -m flappy_engine.shared --attach NAME
+"""
+import argparse
+import multiprocessing
+import random
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from .core import BIRD_SHAPES, PIPE_CAPACITY, RULES, WINDOW_HEIGHT, WINDOW_WIDTH, Bird, Game
+from .timing import FPS, MAX_FRAME_MS
+
+MAGIC = b'FLSM'
+VERSION = 1
+# magic, version, pipe capacity, then the published slot, the flap counter
+# and the stop flag, each on its own 8-byte word
+HEADER = struct.Struct('<4sII4xqqq')
+LATEST_OFFSET = 16
+FLAPS_OFFSET = 24
+STOP_OFFSET = 32
+WORD = struct.Struct('<q')
+# sequence, frame, score, bird y, bird velocity, active, shape, death cause,
+# seed, pipe count
+STATE = struct.Struct('<qqqddBBBxqI4x')
+# x, height, gap, color
+PIPE = struct.Struct('<dii3B5x')
+
+DEATH_CAUSES = [None, 'pipe', 'ceiling', 'ground']
+# Frames a bot's finished game stays on screen before the next one starts
+RESTART_FRAMES = FPS
+
+
+class PipeState:
+    __slots__ = ('x', 'height', 'gap', 'color')
+
+    def __init__(self):
+        self.x = self.height = self.gap = 0
+        self.color = (0, 0, 0)
+
+
+class Snapshot:
+    """One published state, laid out like a Game for GameView.draw()."""
+
+    rules = RULES
+
+    def __init__(self):
+        self.sequence = 0
+        self.frame = 0
+        self.score = 0
+        self.game_active = True
+        self.death_cause = None
+        self.seed = 0
+        self.bird = Bird()
+        self.pipes = []
+        self._pipes = []
+
+
+class SharedState:
+    """The shared block: a header and two state slots."""
+
+    def __init__(self, block, owner=False):
+        self.block = block
+        self.buf = block.buf
+        self.owner = owner
+        magic, version, self.capacity, _, _, _ = HEADER.unpack_from(self.buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{block.name} is not a shared game state block')
+        self.slot_size = STATE.size + self.capacity * PIPE.size
+        self.sequence = 0
+        self.latest = 0
+
+    @classmethod
+    def create(cls, capacity=PIPE_CAPACITY, name=None):
+        slot_size = STATE.size + capacity * PIPE.size
+        block = shared_memory.SharedMemory(name, create=True, size=HEADER.size + 2 * slot_size)
+        HEADER.pack_into(block.buf, 0, MAGIC, VERSION, capacity, 0, 0, 0)
+        return cls(block, owner=True)
+
+    @classmethod
+    def attach(cls, name, track=True):
+        """Open the block called name.
+
+        A process outside the simulation's process tree passes track=False:
+        before Python 3.13 attaching also registers the block to be removed
+        when that process exits, which would pull it from under the others.
+        """
+        block = shared_memory.SharedMemory(name)
+        if not track:
+            resource_tracker.unregister(block._name, 'shared_memory')
+        return cls(block)
+
+    @property
+    def name(self):
+        return self.block.name
+
+    def _slot(self, index):
+        return HEADER.size + index * self.slot_size
+
+    def publish(self, game, seed=0):
+        """Write game, played on course seed, into the slot readers aren't on,
+        then point them at it."""
+        buf = self.buf
+        index = 1 - self.latest
+        offset = self._slot(index)
+        self.sequence += 2
+        WORD.pack_into(buf, offset, self.sequence - 1)
+        bird = game.bird
+        pipes = game.pipes
+        count = min(len(pipes), self.capacity)
+        STATE.pack_into(buf, offset, self.sequence - 1, game.frame, game.score, bird.y,
+                        bird.velocity, game.game_active, BIRD_SHAPES.index(bird.shape),
+                        DEATH_CAUSES.index(game.death_cause), seed, count)
+        position = offset + STATE.size
+        for i in range(count):
+            pipe = pipes[i]
+            PIPE.pack_into(buf, position, pipe.x, pipe.height, pipe.gap, *pipe.color)
+            position += PIPE.size
+        WORD.pack_into(buf, offset, self.sequence)
+        WORD.pack_into(buf, LATEST_OFFSET, index)
+        self.latest = index
+
+    def read(self, snapshot):
+        """Fill snapshot with the latest complete state; returns whether it is new."""
+        buf = self.buf
+        while True:
+            offset = self._slot(WORD.unpack_from(buf, LATEST_OFFSET)[0])
+            # The sequence is read on its own before the copy, not out of it:
+            # a copy is free to load its words in any order
+            sequence = WORD.unpack_from(buf, offset)[0]
+            if sequence % 2:
+                continue
+            data = bytes(buf[offset:offset + self.slot_size])
+            if WORD.unpack_from(buf, offset)[0] == sequence:
+                break
+        if sequence == snapshot.sequence:
+            return False
+        (snapshot.sequence, snapshot.frame, snapshot.score, y, velocity, active, shape, cause,
+         snapshot.seed, count) = STATE.unpack_from(data)
+        bird = snapshot.bird
+        if bird.shape != BIRD_SHAPES[shape]:
+            bird = snapshot.bird = Bird(BIRD_SHAPES[shape])
+        bird.y = y
+        bird.velocity = velocity
+        snapshot.game_active = bool(active)
+        snapshot.death_cause = DEATH_CAUSES[cause]
+        pool = snapshot._pipes
+        while len(pool) < count:
+            pool.append(PipeState())
+        position = STATE.size
+        for pipe in pool[:count]:
+            pipe.x, pipe.height, pipe.gap, r, g, b = PIPE.unpack_from(data, position)
+            pipe.color = (r, g, b)
+            position += PIPE.size
+        snapshot.pipes = pool[:count]
+        return True
+
+    def flap(self):
+        """Ask the simulation to flap, or to restart a finished game.
+
+        The counter is bumped without a lock, so only one viewer at a time
+        should be sending input.
+        """
+        WORD.pack_into(self.buf, FLAPS_OFFSET, self.flaps + 1)
+
+    @property
+    def flaps(self):
+        return WORD.unpack_from(self.buf, FLAPS_OFFSET)[0]
+
+    @property
+    def stopped(self):
+        return WORD.unpack_from(self.buf, STOP_OFFSET)[0] != 0
+
+    def stop(self):
+        WORD.pack_into(self.buf, STOP_OFFSET, 1)
+
+    def close(self):
+        self.buf = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+
+def simulate(name, seed=0, shape='square', bot=None, fps=FPS):
+    """Step a game at fps steps per second and publish every step to the block name."""
+    state = SharedState.attach(name)
+    controller = None
+    if bot:
+        from .farm import resolve
+        controller = resolve(bot)
+        if isinstance(controller, type):
+            controller = controller()
+    game = Game(random.Random(seed), shape)
+    state.publish(game, seed)
+    flaps = state.flaps
+    over = 0
+    period = 1 / fps
+    deadline = time.perf_counter()
+    try:
+        while not state.stopped:
+            pressed = state.flaps
+            flap = pressed != flaps
+            flaps = pressed
+            if controller is not None:
+                flap = game.game_active and controller(game)
+                over = 0 if game.game_active else over + 1
+                restart = over > RESTART_FRAMES
+            else:
+                restart = flap and not game.game_active
+            # A finished game is left as published until it restarts
+            if restart:
+                seed += 1
+                game.rng = random.Random(seed)
+                game.reset()
+                state.publish(game, seed)
+            elif game.game_active:
+                game.step(flap)
+                state.publish(game, seed)
+
+            # Fixed ticks; after a stall, carry on from now rather than
+            # running the missed ticks back to back
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -MAX_FRAME_MS / 1000:
+                deadline = time.perf_counter()
+    except KeyboardInterrupt:
+        # Ctrl+C reaches the whole process group; main() stops everything
+        pass
+    finally:
+        state.close()
+
+
+def view(name, dirty=False, track=True, fps=FPS):
+    """Draw the latest state of the block name in a window until it is closed."""
+    import pygame
+
+    from .render import GameView
+    from .startup import init
+    from .text import render_text
+
+    state = SharedState.attach(name, track)
+    init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption('Flappy Bird')
+    game_view = GameView(screen, dirty)
+    clock = pygame.time.Clock()
+    snapshot = Snapshot()
+    try:
+        while not state.stopped:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (
+                        event.type == pygame.KEYDOWN and event.key in (pygame.K_ESCAPE,
+                                                                       pygame.K_q)):
+                    return
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                    state.flap()
+            if state.read(snapshot):
+                if snapshot.game_active:
+                    game_view.draw(snapshot)
+                else:
+                    renderer = game_view.renderer
+                    renderer.begin()
+                    for i, line in enumerate(('Game Over!', f'Score: {snapshot.score}')):
+                        text = render_text(game_view.font, line, True, (0, 0, 0))
+                        renderer.mark(screen.blit(text, (WINDOW_WIDTH // 2 - text.get_width() // 2,
+                                                         WINDOW_HEIGHT // 2 - 60 + 60 * i)))
+                    renderer.present()
+            clock.tick(fps)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pygame.quit()
+        state.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the simulation and its viewers '
+                                     'as separate processes')
+    parser.add_argument('--viewers', type=int, default=1,
+                        help='windows drawing the game; with 0, only --attach viewers')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shape', default='square', choices=BIRD_SHAPES)
+    parser.add_argument('--bot', metavar='MODULE:CONTROLLER',
+                        help='let a controller play (attract mode)')
+    parser.add_argument('--dirty', action='store_true')
+    parser.add_argument('--attach', metavar='NAME',
+                        help="only open a viewer on a running simulation's block")
+    args = parser.parse_args(argv)
+
+    if args.attach:
+        view(args.attach, args.dirty, track=False)
+        return
+
+    state = SharedState.create()
+    print(f'shared state: {state.name}', file=sys.stderr)
+    simulation = multiprocessing.Process(
+        target=simulate, args=(state.name, args.seed, args.shape, args.bot))
+    viewers = [multiprocessing.Process(target=view, args=(state.name, args.dirty))
+               for _ in range(args.viewers)]
+    simulation.start()
+    for viewer in viewers:
+        viewer.start()
+    try:
+        # Run until the windows are closed, or with none until Ctrl+C
+        for process in viewers or [simulation]:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state.stop()
+        simulation.join()
+        for viewer in viewers:
+            viewer.join()
+        state.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+"""Perfect play: the fewest flaps that get through a seeded course.
+
+The search is exact and runs over every state the bird can be in on every
+frame. Positions and velocities are whole multiples of a small power of two
+(see courses.py), so one frame's states are a bitset over y per velocity. On
+any frame the pipes, ceiling and ground leave the bird one interval of safe
+positions. It comes from the bird's shape extents against the pipe at that
+frame's offset, with the same int() truncation as Game, so a frame of search
+is a shift and a mask per velocity.
+
+To minimise flaps, states are kept in layers by flap count, and a state
+stays only in the cheapest layer that reaches it. Falling maps each
+velocity's states one to one onto the next velocity's, so only a flap can
+land on a state a cheaper layer holds, and only the flap velocity has to be
+checked. Where each layer's flaps land is kept for every frame. Since its last
+flap the bird has only fallen, so a state's velocity gives the frame of that
+flap, and the input sequence is rebuilt backwards one flap at a time from the
+landings without searching again. A 1000-pipe course takes about ten
+seconds and 50 MB to solve, and about four seconds to prove feasible or not.
+
+No work is shared between pipes. The sets courses.py tabulates are kept
+within the span of two gaps, so they settle into a few dozen shapes. Here
+every reachable state is kept, with its flap count, and the layers as each
+pipe spawns differ on every pipe even measured from its gap (all 299 of a
+300-pipe course are distinct), so a memo would never hit.
+
+If every state dies, no input sequence exists, and the frame and pipe where
+the last state died are reported. margin keeps the bird that many pixels
+clear of the pipes, and max_margin() searches for the largest margin that
+still gets through.
+
+Usage:
+    python -m flappy_engine.solver --seed 0 --pipes 1000 [--record perfect.flrp]
+"""
+import argparse
+import random
+import sys
+import time
+from collections import namedtuple
+from fractions import Fraction
+
+from .core import (BIRD_SHAPES, BIRD_SIZE, BIRD_X, GROUND_Y, PHYSICS, PIPE_COLORS,
+                   PIPE_INTERVAL, PIPE_MAX_HEIGHT, PIPE_MIN_HEIGHT, PIPE_WIDTH, WINDOW_HEIGHT,
+                   WINDOW_WIDTH, Game, shape_extents)
+from .courses import Course
+from .events import play
+from .replay import Replay
+
+Solution = namedtuple('Solution', ['flaps', 'actions'])
+
+
+class Unsolvable(ValueError):
+    """No input sequence gets through; every state dies on frame, at pipe."""
+
+    def __init__(self, frame, pipe):
+        super().__init__(f'no state survives frame {frame} (pipe {pipe})')
+        self.frame = frame
+        self.pipe = pipe
+
+
+def course_heights(seed, pipes, physics=PHYSICS, course=None):
+    """Gap heights of the first pipes of Game(random.Random(seed), ...).
+
+    The rng is drawn from in the same order as the game draws it: a height
+    (from course, if given) and then a color for every pipe.
+    """
+    rng = random.Random(seed)
+    if course is not None:
+        course.reset()
+    heights = []
+    for _ in range(pipes):
+        if course is None:
+            heights.append(rng.randint(PIPE_MIN_HEIGHT, PIPE_MAX_HEIGHT))
+        else:
+            heights.append(course.next_height(rng))
+        rng.choice(PIPE_COLORS)
+    return heights
+
+
+def _shift(bits, n):
+    return bits << n if n >= 0 else bits >> -n
+
+
+class Solver:
+    """Exact search over a course given as a list of gap heights.
+
+    The bird and pipes have the default rules' geometry and flap, as in
+    flappy_claude3.5.py; courses of the other rules are not solved.
+    """
+
+    def __init__(self, heights, shape='square', physics=PHYSICS, margin=0):
+        gravity, jump_speed, pipe_gap, pipe_speed = physics
+        unit = max(Fraction(gravity).denominator, Fraction(jump_speed).denominator)
+        if unit > 256:
+            raise ValueError('gravity and jump_speed must be multiples of 1/256')
+        self.heights = heights
+        self.physics = physics
+        self.unit = unit
+        self.gravity = int(gravity * unit)
+        self.flap_velocity = int((jump_speed + gravity) * unit)
+        self.extents = shape_extents(shape)
+        self.margin = margin
+        self.period = PIPE_INTERVAL + 1
+        # Frames after its spawn that a pipe overlaps the bird, and how far
+        # its left edge is from the bird's on each of them
+        bird_left = int(BIRD_X - BIRD_SIZE / 2)
+        self.window = []
+        frame = 0
+        left = WINDOW_WIDTH + 30 - pipe_speed - PIPE_WIDTH // 2
+        while left + PIPE_WIDTH > bird_left:
+            if bird_left + BIRD_SIZE > left:
+                self.window.append((frame, left - bird_left))
+            frame += 1
+            left -= pipe_speed
+        # The game ends for us once the last pipe has passed the bird
+        self.frames = self.period * len(heights) + self.window[-1][0] if heights else 0
+        self.open = self._interval(0, GROUND_Y * unit)
+        self._masks = {}
+
+    def _interval(self, low, high):
+        """Bitmask of the unit positions low <= y <= high."""
+        low = max(low, 0)
+        high = min(high, GROUND_Y * self.unit)
+        return ((1 << max(high - low + 1, 0)) - 1) << low
+
+    def _pipe_bounds(self, height, offset):
+        unit = self.unit
+        extent = self.extents[offset + PIPE_WIDTH - 1]
+        low, high = 0, GROUND_Y * unit
+        if extent is not None:
+            first, last = extent
+            top = height - self.physics.pipe_gap
+            # Safe while top - first <= int(y - 15) <= height - last - 1
+            if top > 0:
+                c = top - first + self.margin
+                low = (c + 15) * unit if c >= 1 else (c + 14) * unit + 1
+            d = height - last - 1 - self.margin
+            high = (d + 16) * unit - 1 if d >= 0 else (d + 15) * unit
+        return max(low, 0), min(high, GROUND_Y * unit)
+
+    def _pipe_mask(self, height, offset):
+        key = (height, offset)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = self._interval(*self._pipe_bounds(height, offset))
+        return mask
+
+    def _pipe(self, frame):
+        # (height, offset) of the pipe overlapping the bird on frame, if any
+        # Pipe k spawns on frame period * (k + 1); at most one overlaps the bird
+        for k in (frame // self.period - 1, frame // self.period - 2):
+            if 0 <= k < len(self.heights):
+                age = frame - self.period * (k + 1)
+                first_frame = self.window[0][0]
+                if first_frame <= age <= self.window[-1][0]:
+                    return self.heights[k], self.window[age - first_frame][1]
+        return None
+
+    def bounds(self, frame):
+        """Lowest and highest unit position the bird survives on frame."""
+        pipe = self._pipe(frame)
+        return (0, GROUND_Y * self.unit) if pipe is None else self._pipe_bounds(*pipe)
+
+    def mask(self, frame):
+        """Positions the bird survives on frame (1-based, like Game.frame)."""
+        pipe = self._pipe(frame)
+        return self.open if pipe is None else self._pipe_mask(*pipe)
+
+    def pipe_at(self, frame):
+        """Index of the pipe the bird is at or next reaches on frame."""
+        last = self.window[-1][0]
+        pipe = -((last - frame) // self.period) - 1
+        return max(min(pipe, len(self.heights) - 1), 0)
+
+    def _step(self, layers, frame, limit=None):
+        """Advance the flap-count layers one frame; returns (skipped, layers).
+
+        Layers more than limit flaps above the cheapest are dropped.
+        """
+        gravity = self.gravity
+        flap = self.flap_velocity
+        mask = self.mask(frame)
+        advanced = []
+        # A state is kept only in its cheapest layer. Falling maps each
+        # velocity's states one to one onto the next velocity, so layers that
+        # were disjoint stay so, and only flaps can land on a state a cheaper
+        # layer already holds.
+        seen = 0
+        landed = 0
+        for tracks in layers:
+            kept = {flap: landed} if landed else {}
+            seen |= landed
+            flapped = 0
+            for velocity, positions in tracks.items():
+                flapped |= positions
+                velocity += gravity
+                if velocity >= 0:
+                    positions = positions << velocity & mask
+                else:
+                    positions = positions >> -velocity & mask
+                if positions:
+                    # Only flaps reach the flap velocity, so no key repeats
+                    kept[velocity] = positions
+            advanced.append(kept)
+            landed = _shift(flapped, flap) & mask & ~seen
+        if landed:
+            advanced.append({flap: landed})
+        skipped = 0
+        while advanced and not advanced[0]:
+            advanced.pop(0)
+            skipped += 1
+        if limit is not None:
+            del advanced[limit - skipped + 1:]
+        while advanced and not advanced[-1]:
+            advanced.pop()
+        return skipped, advanced
+
+    def _start(self):
+        return [{0: 1 << (WINDOW_HEIGHT // 2 * self.unit)}]
+
+    def feasible(self):
+        """Whether any input gets through, without counting flaps."""
+        tracks = self._start()[0]
+        gravity = self.gravity
+        flap = self.flap_velocity
+        for frame in range(1, self.frames + 1):
+            mask = self.mask(frame)
+            advanced = {}
+            flapped = 0
+            for velocity, positions in tracks.items():
+                flapped |= positions
+                velocity += gravity
+                positions = _shift(positions, velocity) & mask
+                if positions:
+                    advanced[velocity] = positions
+            flapped = _shift(flapped, flap) & mask
+            if flapped:
+                advanced[flap] = advanced.get(flap, 0) | flapped
+            if not advanced:
+                return False
+            tracks = advanced
+        return True
+
+    def solve(self):
+        """The minimum-flap Solution; raises Unsolvable if there is none."""
+        flap = self.flap_velocity
+        # Where each layer's flaps land on every frame, which is all the
+        # walk back needs
+        base, layers = 0, self._start()
+        landings = [(0, ())]
+        for frame in range(1, self.frames + 1):
+            skipped, layers = self._step(layers, frame)
+            if not layers:
+                raise Unsolvable(frame, self.pipe_at(frame))
+            base += skipped
+            landings.append((base, tuple(tracks.get(flap, 0) for tracks in layers)))
+
+        # Walk back from the cheapest final state. Since its last flap the
+        # bird has only fallen, so its velocity gives the frame of that flap,
+        # and the flap leaves a state of one flap less to look up.
+        cost = base
+        tracks = layers[0]
+        velocity = min(tracks)
+        position = (tracks[velocity] & -tracks[velocity]).bit_length() - 1
+        frame = self.frames
+        actions = [False] * self.frames
+        while cost:
+            age = (velocity - flap) // self.gravity
+            frame -= age
+            position -= self._fall(age)
+            actions[frame - 1] = True
+            frame -= 1
+            position -= flap
+            cost -= 1
+            velocity = self._velocity(landings, frame, position, cost)
+        return Solution(sum(actions), actions)
+
+    def _fall(self, age):
+        """How far the bird moves in the age frames after a flap."""
+        return age * self.flap_velocity + self.gravity * age * (age + 1) // 2
+
+    def _velocity(self, landings, frame, position, cost):
+        """Velocity of a state at position on frame that costs exactly cost.
+
+        Prefers the most recent flap, so flaps come as late as they can.
+        """
+        if not cost:
+            # The bird has fallen from the start since frame 0
+            return self.gravity * frame
+        for age in range(frame):
+            landed = position - self._fall(age)
+            base, sets = landings[frame - age]
+            index = cost - base
+            if (landed >= 0 and 0 <= index < len(sets) and sets[index] >> landed & 1
+                    and all(low <= landed + self._fall(fallen) <= high
+                            for fallen, (low, high) in enumerate(
+                                map(self.bounds, range(frame - age + 1, frame + 1)), 1))):
+                return self.flap_velocity + self.gravity * age
+        raise AssertionError('search layers are inconsistent')
+
+def solve(heights, shape='square', physics=PHYSICS, margin=0):
+    return Solver(heights, shape, physics, margin).solve()
+
+
+def max_margin(heights, shape='square', physics=PHYSICS):
+    """The widest clearance from the pipes, in pixels, that still gets through."""
+    low, high = -1, (physics.pipe_gap - BIRD_SIZE) // 2 + 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        if Solver(heights, shape, physics, middle).feasible():
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find the fewest flaps through a course')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pipes', type=int, default=100)
+    parser.add_argument('--shape', default='square', choices=BIRD_SHAPES)
+    parser.add_argument('--margin', type=int, default=0, help='clearance from the pipes')
+    parser.add_argument('--survivable', action='store_true',
+                        help='generate the course with courses.Course')
+    parser.add_argument('--max-margin', action='store_true',
+                        help='also report the widest clearance that gets through')
+    parser.add_argument('--record', metavar='FILE', help='save the solution as a replay')
+    args = parser.parse_args(argv)
+
+    course = Course(PHYSICS) if args.survivable else None
+    heights = course_heights(args.seed, args.pipes, PHYSICS, course)
+    start = time.perf_counter()
+    try:
+        solution = solve(heights, args.shape, PHYSICS, args.margin)
+    except Unsolvable as exc:
+        print(f'unsolvable: {exc}')
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    print(f'{args.pipes} pipes: {solution.flaps} flaps over {len(solution.actions)} frames '
+          f'({elapsed:.2f}s)')
+    if args.max_margin:
+        print(f'max margin {max_margin(heights, args.shape, PHYSICS)} px')
+    # Play the inputs in the real engine, then let the bird fall so a replay
+    # ends on its death like a recorded game
+    game = Game(random.Random(args.seed), args.shape, PHYSICS, course)
+    actions = list(solution.actions)
+    play(game, [frame for frame, action in enumerate(actions) if action], len(actions))
+    if game.score < args.pipes:
+        print(f'solution only scores {game.score}', file=sys.stderr)
+        sys.exit(2)
+    play(game, ())
+    actions += [False] * (game.frame - len(actions))
+    if args.record:
+        if course is not None:
+            print('replays do not record the course generator', file=sys.stderr)
+        replay = Replay(args.seed, args.shape, PHYSICS, score=game.score)
+        for action in actions:
+            replay.record(action)
+        replay.save(args.record)
+
+if __name__ == '__main__':
+    main()
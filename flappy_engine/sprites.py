@@ -0,0 +1,30 @@
+"""Pre-rendered bird sprites with collision masks.
+
+Each shape/color pair is rasterized once from core.shape_spans into a
+display-format surface, and its pygame.mask.Mask is built once alongside it,
+so drawing is a single blit and collision can be pixel exact.
+"""
+import pygame
+
+from .core import BIRD_SIZE, shape_spans
+
+COLORKEY = (255, 0, 255)
+
+_sprites = {}
+
+
+def bird_sprite(shape, color, size=BIRD_SIZE):
+    """Return the cached (surface, mask) pair for a bird."""
+    key = (shape, tuple(color), size)
+    sprite = _sprites.get(key)
+    if sprite is None:
+        surface = pygame.Surface((size, size))
+        surface.fill(COLORKEY)
+        for row, (start, stop) in enumerate(shape_spans(shape, size)):
+            if start < stop:
+                surface.fill(color, (start, row, stop - start, 1))
+        surface.set_colorkey(COLORKEY)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        sprite = _sprites[key] = (surface, pygame.mask.from_surface(surface))
+    return sprite
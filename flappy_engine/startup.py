@@ -0,0 +1,91 @@
+"""Fast start-up for the pygame front-ends.
+
+pygame.init() brings up every subsystem pygame has imported, including the
+mixer, which opens an audio device, and the joystick subsystem, which scans
+input devices. None of the games uses either. init() starts only display and
+font.
+
+pygame.font.SysFont() asks fontconfig for the full list of system fonts
+before it looks anything up, even when the name is None. sys_font() goes
+straight to the built-in font for None. For a named font it keeps the file
+the name resolved to in a small JSON cache on disk, so only the first launch
+on a machine pays for the scan.
+
+Without pygame.init(), pygame.time.get_ticks() always returns 0. Games that
+time things in milliseconds use get_ticks() from here instead. It leaves out
+the time the game spent paused (see idle.py).
+"""
+import json
+import os
+import time
+
+import pygame
+
+CACHE_PATH = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                          'flappy-bird-llm', 'fonts.json')
+
+_started = time.perf_counter()
+_font_paths = None
+
+
+def init():
+    """Start the display and font subsystems only."""
+    global _started
+    pygame.display.init()
+    pygame.font.init()
+    _started = time.perf_counter()
+
+
+def get_ticks():
+    """Milliseconds since init(), like pygame.time.get_ticks()."""
+    return int((time.perf_counter() - _started) * 1000)
+
+
+def pause_ticks(seconds):
+    """Leave seconds the game spent paused out of get_ticks()."""
+    global _started
+    _started += seconds
+
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(paths):
+    # Written whole and renamed into place so a killed launch can't leave
+    # half a file behind; a read-only home just means no cache
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        temporary = f'{CACHE_PATH}.{os.getpid()}'
+        with open(temporary, 'w') as f:
+            json.dump(paths, f, indent=2, sort_keys=True)
+        os.replace(temporary, CACHE_PATH)
+    except OSError:
+        pass
+
+
+def font_path(name):
+    """File of the system font called name, or None for the built-in font."""
+    global _font_paths
+    if name is None:
+        return None
+    if _font_paths is None:
+        _font_paths = _load_cache()
+    key = name.lower()
+    if key in _font_paths:
+        path = _font_paths[key]
+        # Fonts can be uninstalled; None records a name that has no font
+        if path is None or os.path.exists(path):
+            return path
+    path = _font_paths[key] = pygame.font.match_font(name)
+    _save_cache(_font_paths)
+    return path
+
+
+def sys_font(name, size):
+    """pygame.font.SysFont(name, size) without the scan once name is cached."""
+    return pygame.font.Font(font_path(name), size)
@@ -0,0 +1,77 @@
+"""Continuous collision tests for a shape moving in a straight line.
+
+Each test takes the shape at the start of a move, the move (dx, dy) and a
+stationary rect (x, y, w, h), and returns the time of impact: the fraction of
+the move, from 0 to 1, after which the two overlap, 0 if they already do, or
+None if the whole move stays clear. Overlap means the interiors intersect,
+so touching edges don't count, as with pygame.Rect.colliderect.
+
+A pipe that moves as well is handled by giving the shape the relative move.
+"""
+import math
+
+
+def _slab(start, size, move, low, high):
+    """Entry and exit times of the span [start, start + size) against [low, high)."""
+    if move == 0:
+        if start + size > low and start < high:
+            return -math.inf, math.inf
+        return math.inf, -math.inf
+    enter = (low - size - start) / move
+    leave = (high - start) / move
+    if enter > leave:
+        enter, leave = leave, enter
+    return enter, leave
+
+
+def swept_box(box, dx, dy, rect):
+    """Time of impact of box moving by (dx, dy) with rect."""
+    x, y, w, h = box
+    rx, ry, rw, rh = rect
+    if w < 0 or h < 0 or rw <= 0 or rh <= 0:
+        return None
+    x_enter, x_leave = _slab(x, w, dx, rx, rx + rw)
+    y_enter, y_leave = _slab(y, h, dy, ry, ry + rh)
+    enter = max(x_enter, y_enter)
+    leave = min(x_leave, y_leave)
+    if enter >= leave or enter >= 1 or leave <= 0:
+        return None
+    return max(enter, 0.0)
+
+
+def _swept_disk(px, py, dx, dy, cx, cy, radius):
+    """Time at which the point first comes within radius of (cx, cy)."""
+    ox = px - cx
+    oy = py - cy
+    c = ox * ox + oy * oy - radius * radius
+    if c < 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    b = 2 * (ox * dx + oy * dy)
+    discriminant = b * b - 4 * a * c
+    if a == 0 or discriminant <= 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    return t if 0 <= t < 1 else None
+
+
+def swept_circle(cx, cy, radius, dx, dy, rect):
+    """Time of impact of the circle at (cx, cy) moving by (dx, dy) with rect.
+
+    The circle overlaps rect exactly when its center is inside rect grown
+    by radius with rounded corners. That region is the union of rect
+    stretched by radius across and along and a disk at each corner, so the
+    first contact is the earliest entry of the center into any of them.
+    """
+    rx, ry, rw, rh = rect
+    if rw <= 0 or rh <= 0:
+        return None
+    times = [
+        swept_box((cx, cy, 0, 0), dx, dy, (rx - radius, ry, rw + 2 * radius, rh)),
+        swept_box((cx, cy, 0, 0), dx, dy, (rx, ry - radius, rw, rh + 2 * radius)),
+    ]
+    for corner_x in (rx, rx + rw):
+        for corner_y in (ry, ry + rh):
+            times.append(_swept_disk(cx, cy, dx, dy, corner_x, corner_y, radius))
+    times = [t for t in times if t is not None]
+    return min(times) if times else None
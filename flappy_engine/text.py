@@ -0,0 +1,35 @@
+"""Cache of rendered text surfaces for HUD and game-over screens.
+
+Font.render rasterizes every glyph on each call, which is the most expensive
+part of drawing a frame. The HUD text only changes when the score does, so
+surfaces are kept in a small LRU keyed by everything that affects the pixels.
+"""
+from collections import OrderedDict
+
+
+class TextCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, antialias, color, background=None):
+        """Same arguments and result as font.render(), rasterized once."""
+        key = (font, text, antialias, tuple(color),
+               tuple(background) if background is not None else None)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color, background)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.maxsize:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# Shared by all HUD drawing
+text_cache = TextCache()
+render_text = text_cache.render
@@ -0,0 +1,45 @@
+"""Fixed-timestep clock.
+
+Game time is counted in simulation frames rather than read from
+pygame.time.get_ticks(), so spawn timers fire after the same number of frames
+whether the game runs in real time, fast-forwarded or headless.
+"""
+
+FPS = 60
+# Longest frame caught up on; after a stall the game resumes instead of
+# running every missed step at once
+MAX_FRAME_MS = 250
+
+
+def ms_to_frames(ms, fps=FPS):
+    """Convert a millisecond interval from the original games into frames."""
+    return ms * fps // 1000
+
+
+class FixedTimestep:
+    """Turns elapsed wall-clock time into a whole number of fixed steps.
+
+    speed scales game time against real time: 10 runs ten simulation frames
+    per real frame, 0.5 runs one every other frame.
+    """
+
+    def __init__(self, fps=FPS, speed=1.0, max_frame_ms=MAX_FRAME_MS):
+        self.fps = fps
+        self.step_ms = 1000 / fps
+        self.speed = speed
+        self.max_frame_ms = max_frame_ms
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms):
+        """Add elapsed real time and return how many steps are now due."""
+        elapsed_ms = min(elapsed_ms, self.max_frame_ms)
+        self.accumulator += elapsed_ms * self.speed / self.step_ms
+        # The epsilon keeps float error in 1000 / fps from dropping a step
+        steps = int(self.accumulator + 1e-9)
+        self.accumulator -= steps
+        return steps
+
+    @property
+    def alpha(self):
+        """How far game time is between the last step and the next, from 0 to 1."""
+        return max(self.accumulator, 0.0)
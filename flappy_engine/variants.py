@@ -0,0 +1,165 @@
+"""The rules of every implementation, as core.Rules plugins.
+
+Each class restates what one flappy_*.py file does differently from
+flappy_claude3.5.py, read off its update loop; Game(rng, shape, rules=...) and
+BatchGame then play that implementation headlessly. Millisecond timers become
+frame counts with ms_to_frames, and every random draw that shapes the course
+comes from the game's rng.
+
+Only the rules are reproduced, not the pygame front-ends' restart quirks: the
+engine always starts a game from a clean reset.
+"""
+from .core import RULES, Physics, Rules, shape_extents
+from .timing import ms_to_frames
+
+
+class GapBelowRules(Rules):
+    """Rules that draw where the top pipe ends rather than where the bottom starts."""
+
+    masks = False
+    pipe_offset = 0
+    top_min = 100
+    top_max = 350
+
+    def height_range(self, gap):
+        return self.top_min + gap, self.top_max + gap
+
+
+class DeepSeekRules(GapBelowRules):
+    """flappy_deepseek.py: flaps add up and the ceiling stops the bird."""
+
+    name = 'deepseek'
+    physics = Physics(0.5, -10, 150, 3)
+    bird_x = 50
+    bird_offset = -10
+    bird_size = 20
+    clamp_ceiling = True
+    pipe_colors = [(0, 100, 0), (181, 101, 29), (64, 64, 64)]
+    spawn_x = 400
+    pipe_interval = ms_to_frames(1500)
+    # x + width < bird x, and x <= -width
+    score_x = -10
+    expire_x = -59
+
+    def jump(self, velocity, jump_speed):
+        return velocity + jump_speed
+
+    def grounded(self, y):
+        # The rect bottom, int(y - 10) + 20, reaching the land
+        return y >= 540
+
+
+class O3MiniRules(GapBelowRules):
+    """flappy_o3mini.py: flaps add up and pipes come at random intervals."""
+
+    name = 'o3mini'
+    physics = Physics(0.5, -8, 150, 3)
+    bird_x = 50
+    bird_offset = 0
+    bird_size = 20
+    ground_y = 530
+    pipe_width = 50
+    pipe_bottom = 550
+    pipe_colors = [(0, 128, 0), (181, 101, 29), (64, 64, 64)]
+    top_max = 300
+    spawn_x = 400
+    # The shortest interval, which sizes the pipe ring
+    pipe_interval = ms_to_frames(1500)
+    random_interval = True
+    # x + width < bird x, and x + width <= 0
+    score_x = 0
+    expire_x = -49
+
+    def jump(self, velocity, jump_speed):
+        return velocity + jump_speed
+
+    def next_interval(self, rng):
+        return ms_to_frames(rng.randint(1500, 2500))
+
+
+class MistralRules(GapBelowRules):
+    """flappy_mistral.py: one pipe, moved back to the right edge as it leaves.
+
+    The pipe scores when it is recycled, not when the bird passes it, and the
+    collision box is tested at the bird's exact y.
+    """
+
+    name = 'mistral'
+    physics = Physics(0.5, -10, 150, 3)
+    bird_x = 50
+    bird_offset = 0
+    bird_size = 20
+    truncate = False
+    ground_y = 530
+    pipe_width = 70
+    pipe_colors = [(0, 100, 0), (139, 69, 19), (105, 105, 105)]
+    top_min = 150
+    top_max = 450
+    spawn_x = 400
+    pipe_interval = None
+    initial_pipes = 1
+    respawn = True
+    score_x = -70
+    expire_x = -70
+
+
+class GeminiFlashRules(GapBelowRules):
+    """flappy_gemini2.0flash.py as intended; the file itself crashes on start.
+
+    Its two starting pipes are generated at the same x, so they play as one
+    pipe that is replaced whenever it scrolls off. The bird is a box of its
+    radius at its exact center, and a pipe scores once as its left edge
+    passes the bird rather than on every frame it overlaps it.
+    """
+
+    name = 'gemini2.0flash'
+    physics = Physics(0.5, -10, 150, 5)
+    bird_x = 50
+    bird_y = 512 // 2
+    bird_offset = -15
+    bird_size = 30
+    truncate = False
+    ground_y = 512 - 50
+    pipe_width = 50
+    pipe_bottom = 512
+    pipe_colors = [(0, 100, 0), (210, 180, 140), (105, 105, 105)]
+    top_max = 512 - 150 - 100
+    spawn_x = 288
+    pipe_interval = None
+    initial_pipes = 1
+    respawn = True
+    score_x = 50
+    expire_x = -50
+
+
+class GeminiThinkingRules(GapBelowRules):
+    """flappy_gemini2.0flash_thinking.py: a wide window with tall land.
+
+    Circle birds collide as a 30 pixel box, squares and triangles as 25.
+    """
+
+    name = 'gemini2.0flash_thinking'
+    physics = Physics(0.5, -10, 150, 3)
+    bird_x = 80
+    bird_y = 480 // 2
+    bird_offset = -12
+    bird_size = 25
+    ground_y = 480 - 100
+    pipe_bottom = 480 - 100
+    pipe_colors = [(0, 100, 0), (139, 69, 19), (105, 105, 105)]
+    top_max = 480 - 100 - 150 - 50
+    spawn_x = 600
+    pipe_interval = ms_to_frames(1500)
+    # right < bird x, and right <= 0
+    score_x = 20
+    expire_x = -59
+
+    def hitbox(self, shape):
+        if shape == 'circle':
+            return -15, 30, shape_extents('square', 30, self.pipe_width)
+        return super().hitbox(shape)
+
+
+VARIANTS = {rules.name: rules for rules in (
+    RULES, DeepSeekRules(), GeminiFlashRules(), GeminiThinkingRules(), MistralRules(),
+    O3MiniRules())}
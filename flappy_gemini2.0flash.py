@@ -1,8 +1,13 @@
 import pygame
 import random
-import time
 
-pygame.init()
+from flappy_engine.idle import IdleWait
+from flappy_engine.pipes import PipeRing
+from flappy_engine.startup import init
+from flappy_engine.text import render_text
+from flappy_engine.timing import FPS, FixedTimestep
+
+init()
 
 # Screen dimensions
 width = 288
@@ -43,15 +48,23 @@ flap_power = -10
 # Pipes
 pipe_width = 50
 pipe_gap = 150
-pipe_x_positions = []
-pipe_heights = []
+
+class Pipe:
+    __slots__ = ('x', 'height')
+
+    def __init__(self, x, height):
+        self.reset(x, height)
+
+    def reset(self, x, height):
+        self.x = x
+        self.height = height  # where the top pipe ends
+
+# Oldest first, recycled as they leave the screen
+pipes = PipeRing(2, Pipe)
 
 def generate_pipe():
     height = random.randint(100, height - pipe_gap - 100)
-    pipe_heights.append(height)
-    pipe_heights.append(height + pipe_gap)  # Bottom pipe
-    pipe_x_positions.append(width)
-    pipe_x_positions.append(width)
+    pipes.spawn(width, height)
 
 
 # Land
@@ -73,8 +86,15 @@ generate_pipe()
 # Game loop
 running = True
 background_color = light_blue #random_light_color()
+clock = pygame.time.Clock()
+idle = IdleWait(clock)
 
+# Physics runs in fixed 60 Hz steps, as many each frame as the time since the
+# last one calls for, so slow frames don't slow the game down
+timestep = FixedTimestep(FPS)
+frame_ms = 1000 / FPS
 while running:
+    idle(game_over)
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
@@ -84,8 +104,7 @@ while running:
                 bird_y = height // 2
                 bird_velocity = 0
                 score = 0
-                pipe_x_positions = []
-                pipe_heights = []
+                pipes.clear()
                 generate_pipe()
                 generate_pipe()
             elif event.key == pygame.K_SPACE and not game_over:
@@ -94,32 +113,32 @@ while running:
                 running = False
 
 
-    if not game_over:
+    steps = timestep.advance(frame_ms)
+    while steps and not game_over:
+        steps -= 1
         # Bird movement
         bird_velocity += gravity
         bird_y += bird_velocity
 
         # Pipe movement
-        for i in range(len(pipe_x_positions)):
-            pipe_x_positions[i] -= 5
+        for pipe in pipes:
+            pipe.x -= 5
 
             # Check for score
-            if pipe_x_positions[i] < bird_x and i % 2 == 0 and pipe_x_positions[i] + pipe_width >= bird_x :
+            if pipe.x < bird_x and pipe.x + pipe_width >= bird_x :
                 score += 1
 
-            if pipe_x_positions[i] < -pipe_width:
-                pipe_x_positions.pop(i)
-                pipe_heights.pop(i)
-                if i % 2 == 0: #only generate when top pipe is removed
-                    generate_pipe()
-                break
+        # Replace pipes that have moved off the screen, oldest first
+        while pipes and pipes[0].x < -pipe_width:
+            pipes.expire()
+            generate_pipe()
 
         # Collision detection
         if bird_y > height - land_height or bird_y < 0:
             game_over = True
-        for i in range(0, len(pipe_x_positions), 2):
-            if bird_x + bird_radius > pipe_x_positions[i] and bird_x - bird_radius < pipe_x_positions[i] + pipe_width:
-                if bird_y - bird_radius < pipe_heights[i] or bird_y + bird_radius > pipe_heights[i] + pipe_gap:
+        for pipe in pipes:
+            if bird_x + bird_radius > pipe.x and bird_x - bird_radius < pipe.x + pipe_width:
+                if bird_y - bird_radius < pipe.height or bird_y + bird_radius > pipe.height + pipe_gap:
                     game_over = True
                     break
 
@@ -128,8 +147,9 @@ while running:
 
     # Pipes
     pipe_color = random.choice([dark_green, light_brown, dark_gray])
-    for i in range(len(pipe_x_positions)):
-        pygame.draw.rect(screen, pipe_color, (pipe_x_positions[i], 0 if i % 2 == 0 else pipe_heights[i] + pipe_gap, pipe_width, pipe_heights[i] if i % 2 == 0 else height - land_height - (pipe_heights[i] + pipe_gap)))
+    for pipe in pipes:
+        pygame.draw.rect(screen, pipe_color, (pipe.x, 0, pipe_width, pipe.height))
+        pygame.draw.rect(screen, pipe_color, (pipe.x, pipe.height + pipe_gap, pipe_width, height - land_height - (pipe.height + pipe_gap)))
 
     # Land
     pygame.draw.rect(screen, land_color, (0, height - land_height, width, land_height))
@@ -143,14 +163,14 @@ while running:
         pygame.draw.polygon(screen, bird_color, [(bird_x, bird_y - bird_radius), (bird_x + bird_radius, bird_y + bird_radius), (bird_x - bird_radius, bird_y + bird_radius)])
 
     # Score
-    score_text = font.render(f"Score: {score}", True, (0, 0, 0))
+    score_text = render_text(font, f"Score: {score}", True, (0, 0, 0))
     screen.blit(score_text, (width - score_text.get_width() - 10, 10))
 
     if game_over:
         best_score = max(best_score, score)
-        game_over_text = font.render("Game Over!", True, (0, 0, 0))
-        best_score_text = font.render(f"Best: {best_score}", True, (0, 0, 0))
-        restart_text = font.render("Press SPACE to restart", True, (0, 0, 0))
+        game_over_text = render_text(font, "Game Over!", True, (0, 0, 0))
+        best_score_text = render_text(font, f"Best: {best_score}", True, (0, 0, 0))
+        restart_text = render_text(font, "Press SPACE to restart", True, (0, 0, 0))
 
         text_x = width // 2
         text_y = height // 2
@@ -160,6 +180,6 @@ while running:
         screen.blit(restart_text, (text_x - restart_text.get_width() // 2, text_y + 50))
 
     pygame.display.flip()
-    time.sleep(1/60)
+    frame_ms = clock.tick(FPS)
 
 pygame.quit()
\ No newline at end of file
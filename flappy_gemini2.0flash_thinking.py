@@ -1,8 +1,13 @@
 import pygame
 import random
 
+from flappy_engine.idle import IdleWait
+from flappy_engine.startup import init
+from flappy_engine.text import render_text
+from flappy_engine.timing import FPS, FixedTimestep, ms_to_frames
+
 # Initialize Pygame
-pygame.init()
+init()
 
 # Screen dimensions
 screen_width = 600
@@ -46,21 +51,22 @@ pipe_gap = 150
 pipe_velocity = -3
 pipe_colors = [dark_green, light_brown, random.choice(dark_gray_shades)]
 pipes = []
-last_pipe_time = pygame.time.get_ticks()
-pipe_spawn_interval = 1500 # milliseconds
+frame = 0 # physics steps so far
+last_pipe_frame = frame
+pipe_spawn_interval = ms_to_frames(1500) # frames
 score = 0
 best_score = 0
 font = pygame.font.Font(None, 36)
 game_over = False
 
 def reset_game():
-    global bird_y, bird_velocity, pipes, score, game_over, last_pipe_time, background_color, bird_shape, bird_color, land_color, pipe_colors
+    global bird_y, bird_velocity, pipes, score, game_over, last_pipe_frame, background_color, bird_shape, bird_color, land_color, pipe_colors
     bird_y = screen_height // 2
     bird_velocity = 0
     pipes = []
     score = 0
     game_over = False
-    last_pipe_time = pygame.time.get_ticks()
+    last_pipe_frame = frame
     background_color = random.choice(light_blue_shades)
     bird_shape = random.choice(bird_shapes)
     bird_color = random.choice(dark_colors)
@@ -125,7 +131,14 @@ def check_collision():
 
 # Game loop
 running = True
+clock = pygame.time.Clock()
+idle = IdleWait(clock)
+# Physics runs in fixed 60 Hz steps, as many each frame as the time since the
+# last one calls for, so slow frames don't slow the game down
+timestep = FixedTimestep(FPS)
+frame_ms = 1000 / FPS
 while running:
+    idle(game_over)
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
@@ -138,14 +151,16 @@ while running:
             if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
                 running = False
 
-    if not game_over:
+    steps = timestep.advance(frame_ms)
+    while steps and not game_over:
+        steps -= 1
         bird_velocity += gravity
         bird_y += bird_velocity
+        frame += 1
 
-        current_time = pygame.time.get_ticks()
-        if current_time - last_pipe_time > pipe_spawn_interval:
+        if frame - last_pipe_frame > pipe_spawn_interval:
             pipes.append(create_pipe())
-            last_pipe_time = current_time
+            last_pipe_frame = frame
 
         move_pipes()
         check_collision()
@@ -160,18 +175,18 @@ while running:
     draw_bird(bird_shape)
 
     # Display score
-    score_text = font.render(f"Score: {score}", True, black)
+    score_text = render_text(font, f"Score: {score}", True, black)
     screen.blit(score_text, (screen_width - score_text.get_width() - 10, 10))
 
     if game_over:
-        best_score_text = font.render(f"Best Score: {best_score}", True, black)
-        game_over_text = font.render("Game Over - Press SPACE to Restart, Q or ESC to Quit", True, black)
+        best_score_text = render_text(font, f"Best Score: {best_score}", True, black)
+        game_over_text = render_text(font, "Game Over - Press SPACE to Restart, Q or ESC to Quit", True, black)
 
         screen.blit(game_over_text, (screen_width//2 - game_over_text.get_width()//2, screen_height//2 - game_over_text.get_height()//2 - 20 ))
         screen.blit(best_score_text, (screen_width//2 - best_score_text.get_width()//2, screen_height//2 + 20))
 
 
     pygame.display.flip()
-    pygame.time.delay(16) # Approx 60 FPS
+    frame_ms = clock.tick(FPS)
 
 pygame.quit()
\ No newline at end of file
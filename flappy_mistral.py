@@ -2,8 +2,13 @@ import pygame
 import random
 import sys
 
+from flappy_engine.idle import IdleWait
+from flappy_engine.startup import init, sys_font
+from flappy_engine.text import render_text
+from flappy_engine.timing import FPS, FixedTimestep
+
 # Initialize Pygame
-pygame.init()
+init()
 
 # Screen dimensions
 SCREEN_WIDTH = 400
@@ -49,7 +54,7 @@ pipe_velocity = -3
 # Score
 score = 0
 best_score = 0
-font = pygame.font.SysFont(None, 36)
+font = sys_font(None, 36)
 
 def draw_bird():
     if bird_shape == 'square':
@@ -71,13 +76,13 @@ def draw_land():
     pygame.draw.rect(screen, land_color, (0, SCREEN_HEIGHT - 50, SCREEN_WIDTH, 50))
 
 def show_score():
-    score_text = font.render(f"Score: {score}", True, (255, 255, 255))
+    score_text = render_text(font, f"Score: {score}", True, (255, 255, 255))
     screen.blit(score_text, (SCREEN_WIDTH - 120, 10))
 
 def show_best_score():
-    best_score_text = font.render(f"Best Score: {best_score}", True, (255, 255, 255))
+    best_score_text = render_text(font, f"Best Score: {best_score}", True, (255, 255, 255))
     screen.blit(best_score_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 50))
-    restart_text = font.render("Press SPACE to restart or Q to quit", True, (255, 255, 255))
+    restart_text = render_text(font, "Press SPACE to restart or Q to quit", True, (255, 255, 255))
     screen.blit(restart_text, (SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT // 2))
 
 def check_collision():
@@ -92,8 +97,14 @@ def check_collision():
 running = True
 game_over = False
 clock = pygame.time.Clock()
+idle = IdleWait(clock)
 
+# Physics runs in fixed 60 Hz steps, as many each frame as the time since the
+# last one calls for, so slow frames don't slow the game down
+timestep = FixedTimestep(FPS)
+frame_ms = 1000 / FPS
 while running:
+    idle(game_over)
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
@@ -109,7 +120,9 @@ while running:
             if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
                 running = False
 
-    if not game_over:
+    steps = timestep.advance(frame_ms)
+    while steps and not game_over:
+        steps -= 1
         bird_velocity += gravity
         bird_y += bird_velocity
 
@@ -132,7 +145,7 @@ while running:
         show_best_score()
 
     pygame.display.flip()
-    clock.tick(60)
+    frame_ms = clock.tick(FPS)
 
 pygame.quit()
 sys.exit()
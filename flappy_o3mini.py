@@ -1,9 +1,21 @@
+import argparse
 import pygame
 import random
 import sys
 
+from flappy_engine.idle import IdleWait
+from flappy_engine.pipes import PipeRing
+from flappy_engine.startup import init, sys_font
+from flappy_engine.text import render_text
+from flappy_engine.timing import FixedTimestep, ms_to_frames
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--seed', type=int, help='replay the same pipe course every run')
+parser.add_argument('--speed', type=float, default=1.0, help='game speed multiplier')
+args = parser.parse_args()
+
 # Initialize pygame
-pygame.init()
+init()
 clock = pygame.time.Clock()
 
 # Screen dimensions
@@ -12,6 +24,7 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Flappy Bird")
 
 # Game constants
+FPS = 60
 GRAVITY = 0.5
 JUMP_BOOST = -8  # each SPACE press adds this (more negative means upward)
 LAND_HEIGHT = 50
@@ -56,9 +69,33 @@ BIRD_SHAPES = ["square", "circle", "triangle"]
 BIRD_X = 50
 BIRD_SIZE = 20  # size of the bird’s bounding box
 
+
+class Pipe:
+    __slots__ = ('x', 'gap_y', 'passed', 'color')
+
+    def __init__(self, x, gap_y, color):
+        self.reset(x, gap_y, color)
+
+    def reset(self, x, gap_y, color):
+        self.x = x
+        self.gap_y = gap_y
+        self.passed = False
+        self.color = color
+
+
 # Font definitions
-score_font = pygame.font.SysFont("Arial", 32)
-small_font = pygame.font.SysFont("Arial", 24)
+score_font = sys_font("Arial", 32)
+small_font = sys_font("Arial", 24)
+
+# Pipes come from their own seeded generator so a seed always gives the
+# same course; the cosmetic colors keep using the global random module.
+# Each game moves on to the next seed so every game can be replayed.
+if args.seed is not None:
+    random.seed(args.seed)
+    game_seed = args.seed
+else:
+    game_seed = random.randrange(2 ** 32)
+timestep = FixedTimestep(FPS, args.speed)
 
 # Global game state variables
 first_run = True  # to start with light blue background
@@ -73,18 +110,22 @@ bird_shape = random.choice(BIRD_SHAPES)
 bird_color = random.choice(DARK_COLORS)
 background_color = (173, 216, 230)  # light blue initially
 land_color = random.choice(LAND_COLORS)
-pipes = []  # each pipe will be a dict: { 'x': ..., 'gap_y': ..., 'passed': bool, 'color': ... }
-last_pipe_time = pygame.time.get_ticks()
-next_pipe_interval = random.randint(1500, 2500)  # in milliseconds
+pipes = PipeRing(4, Pipe)  # oldest first, recycled as they leave the screen
+frame = 0  # simulation steps so far
+# Reseeded for each game by reset_game(): a new Random is 2.5 KB to allocate
+rng = random.Random()
+last_pipe = frame
+next_pipe_interval = 0  # in frames
 
 def reset_game():
     """Reset all game state variables for a new run."""
-    global bird_y, bird_vel, pipes, score, bird_shape, bird_color
-    global background_color, land_color, last_pipe_time, next_pipe_interval, first_run, game_over
+    global bird_y, bird_vel, score, bird_shape, bird_color
+    global background_color, land_color, last_pipe, next_pipe_interval, first_run, game_over
+    global game_seed
 
     bird_y = HEIGHT // 2
     bird_vel = 0
-    pipes = []
+    pipes.clear()
     score = 0
     bird_shape = random.choice(BIRD_SHAPES)
     bird_color = random.choice(DARK_COLORS)
@@ -93,9 +134,11 @@ def reset_game():
         first_run = False
     else:
         background_color = random.choice(LIGHT_COLORS)
+        game_seed += 1
     land_color = random.choice(LAND_COLORS)
-    last_pipe_time = pygame.time.get_ticks()
-    next_pipe_interval = random.randint(1500, 2500)
+    rng.seed(game_seed)
+    last_pipe = frame
+    next_pipe_interval = ms_to_frames(rng.randint(1500, 2500))
     game_over = False
 
 # Start the first game
@@ -103,9 +146,13 @@ reset_game()
 
 # Main game loop
 running = True
+idle = IdleWait(clock)
+# Time the first frame from here rather than from the clock's creation
+clock.tick()
 while running:
-    clock.tick(60)  # 60 frames per second
-    current_time = pygame.time.get_ticks()
+    idle(game_over)
+    # The time since the last frame, however long it took, at most 60 frames per second
+    frame_ms = clock.tick(FPS)
 
     # --- Event Handling ---
     for event in pygame.event.get():
@@ -127,31 +174,33 @@ while running:
                     # Each SPACE press adds an upward boost to the bird (cumulative acceleration)
                     bird_vel += JUMP_BOOST
 
-    if not game_over:
+    # Physics runs in fixed steps, as many as the time since the last frame
+    # calls for, so --speed fast-forwards the same course. The steps are
+    # counted down rather than iterated over a new range()
+    steps = timestep.advance(frame_ms)
+    while steps and not game_over:
+        steps -= 1
         # --- Update Bird ---
         bird_vel += GRAVITY
         bird_y += bird_vel
+        frame += 1
 
         # --- Create New Pipes at Random Intervals ---
-        if current_time - last_pipe_time > next_pipe_interval:
+        if frame - last_pipe > next_pipe_interval:
             # Choose a random vertical position for the gap.
             # Ensure the gap is not too high or too low.
-            gap_y = random.randint(100, HEIGHT - LAND_HEIGHT - PIPE_GAP - 100)
-            pipes.append({
-                'x': WIDTH,
-                'gap_y': gap_y,
-                'passed': False,
-                'color': random.choice(PIPE_COLORS)
-            })
-            last_pipe_time = current_time
-            next_pipe_interval = random.randint(1500, 2500)
+            gap_y = rng.randint(100, HEIGHT - LAND_HEIGHT - PIPE_GAP - 100)
+            pipes.spawn(WIDTH, gap_y, rng.choice(PIPE_COLORS))
+            last_pipe = frame
+            next_pipe_interval = ms_to_frames(rng.randint(1500, 2500))
 
         # --- Move Pipes ---
         for pipe in pipes:
-            pipe['x'] -= PIPE_SPEED
+            pipe.x -= PIPE_SPEED
 
-        # Remove pipes that have moved off the screen
-        pipes = [pipe for pipe in pipes if pipe['x'] + PIPE_WIDTH > 0]
+        # Remove pipes that have moved off the screen, oldest first
+        while pipes and pipes[0].x + PIPE_WIDTH <= 0:
+            pipes.expire()
 
         # --- Collision Detection ---
         # Create a rectangle for the bird
@@ -164,9 +213,9 @@ while running:
 
         # Check collision with each pipe (both top and bottom parts)
         for pipe in pipes:
-            top_pipe_rect = pygame.Rect(pipe['x'], 0, PIPE_WIDTH, pipe['gap_y'])
-            bottom_pipe_rect = pygame.Rect(pipe['x'], pipe['gap_y'] + PIPE_GAP, PIPE_WIDTH,
-                                           (HEIGHT - LAND_HEIGHT) - (pipe['gap_y'] + PIPE_GAP))
+            top_pipe_rect = pygame.Rect(pipe.x, 0, PIPE_WIDTH, pipe.gap_y)
+            bottom_pipe_rect = pygame.Rect(pipe.x, pipe.gap_y + PIPE_GAP, PIPE_WIDTH,
+                                           (HEIGHT - LAND_HEIGHT) - (pipe.gap_y + PIPE_GAP))
             if bird_rect.colliderect(top_pipe_rect) or bird_rect.colliderect(bottom_pipe_rect):
                 game_over = True
                 if score > best_score:
@@ -176,8 +225,8 @@ while running:
         # --- Update Score ---
         # Increase the score if the bird has passed a pipe
         for pipe in pipes:
-            if not pipe['passed'] and pipe['x'] + PIPE_WIDTH < BIRD_X:
-                pipe['passed'] = True
+            if not pipe.passed and pipe.x + PIPE_WIDTH < BIRD_X:
+                pipe.passed = True
                 score += 1
 
     # --- Drawing ---
@@ -186,12 +235,12 @@ while running:
     # Draw pipes
     for pipe in pipes:
         # Top pipe
-        top_rect = pygame.Rect(pipe['x'], 0, PIPE_WIDTH, pipe['gap_y'])
-        pygame.draw.rect(screen, pipe['color'], top_rect)
+        top_rect = pygame.Rect(pipe.x, 0, PIPE_WIDTH, pipe.gap_y)
+        pygame.draw.rect(screen, pipe.color, top_rect)
         # Bottom pipe
-        bottom_rect = pygame.Rect(pipe['x'], pipe['gap_y'] + PIPE_GAP, PIPE_WIDTH,
-                                   (HEIGHT - LAND_HEIGHT) - (pipe['gap_y'] + PIPE_GAP))
-        pygame.draw.rect(screen, pipe['color'], bottom_rect)
+        bottom_rect = pygame.Rect(pipe.x, pipe.gap_y + PIPE_GAP, PIPE_WIDTH,
+                                   (HEIGHT - LAND_HEIGHT) - (pipe.gap_y + PIPE_GAP))
+        pygame.draw.rect(screen, pipe.color, bottom_rect)
 
     # Draw the land at the bottom
     land_rect = pygame.Rect(0, HEIGHT - LAND_HEIGHT, WIDTH, LAND_HEIGHT)
@@ -214,21 +263,21 @@ while running:
         pygame.draw.polygon(screen, bird_color, [point1, point2, point3])
 
     # Draw the current score at the top right
-    score_surface = score_font.render("Score: " + str(score), True, (0, 0, 0))
+    score_surface = render_text(score_font, "Score: " + str(score), True, (0, 0, 0))
     score_rect = score_surface.get_rect(topright=(WIDTH - 10, 10))
     screen.blit(score_surface, score_rect)
 
     # If the game is over, display Game Over and best score text
     if game_over:
-        game_over_surface = score_font.render("Game Over!", True, (255, 0, 0))
+        game_over_surface = render_text(score_font, "Game Over!", True, (255, 0, 0))
         game_over_rect = game_over_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))
         screen.blit(game_over_surface, game_over_rect)
 
-        best_score_surface = small_font.render("Best Score: " + str(best_score), True, (0, 0, 0))
+        best_score_surface = render_text(small_font, "Best Score: " + str(best_score), True, (0, 0, 0))
         best_score_rect = best_score_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
         screen.blit(best_score_surface, best_score_rect)
 
-        restart_surface = small_font.render("Press SPACE to restart", True, (0, 0, 0))
+        restart_surface = render_text(small_font, "Press SPACE to restart", True, (0, 0, 0))
         restart_rect = restart_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))
         screen.blit(restart_surface, restart_rect)
 
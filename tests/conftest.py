@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+
+# Draw without a window, and import flappy_engine from this checkout
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flappy_engine.controllers import gap_follower
+from flappy_engine.core import Game
+
+# Long enough for several pipes to spawn, pass and expire
+FRAMES = 2000
+
+
+def flaps_of(rules, shape, seed, noise=None):
+    """The frames a gap follower flaps on over the course of seed, with a flap
+    now and then added or dropped so that games end in every way."""
+    game = Game(random.Random(seed), shape, rules=rules)
+    noise = random.Random(seed if noise is None else noise)
+    flaps = []
+    while game.game_active and game.frame < FRAMES:
+        action = gap_follower(game) != (noise.random() < 0.003)
+        if action:
+            flaps.append(game.frame)
+        game.step(action)
+    return flaps
+
+
+def stepped(rules, shape, seed, flaps, frames=FRAMES):
+    """The game of seed stepped frame by frame, flapping on flaps."""
+    game = Game(random.Random(seed), shape, rules=rules)
+    flaps = set(flaps)
+    while game.frame < frames and game.step(game.frame in flaps):
+        pass
+    return game
+
+
+def state(game):
+    """Everything a game's ending is compared on."""
+    bird = game.bird
+    return (game.game_active, game.death_cause, game.frame, game.score, game.last_pipe,
+            bird.y, bird.velocity, [(pipe.x, pipe.height) for pipe in game.pipes])
@@ -0,0 +1,20 @@
+import json
+from contextlib import suppress
+
+import pytest
+
+from flappy_engine import allocations
+from flappy_engine.bench import VARIANTS
+
+
+@pytest.mark.parametrize('target', VARIANTS + ['engine'])
+def test_within_allocation_budget(target, tmp_path):
+    output = tmp_path / 'allocations.json'
+    # main() writes the results and then exits with status 1 if anything is
+    # over budget; the assertion below says what
+    with suppress(SystemExit):
+        allocations.main(['--only', target, '--output', str(output)])
+    result = json.loads(output.read_text())['variants'][target]
+    if 'update' not in result:
+        pytest.skip(f"{target} doesn't run: {result.get('error')}")
+    assert result['over_budget'] == []
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from flappy_engine.core import BIRD_SHAPES
+from flappy_engine.variants import VARIANTS
+
+from conftest import FRAMES, flaps_of, stepped
+
+np = pytest.importorskip('numpy')
+batch = pytest.importorskip('flappy_engine.batch')
+
+BIRDS = 8
+
+
+@pytest.mark.parametrize('shape', BIRD_SHAPES)
+@pytest.mark.parametrize('name', sorted(VARIANTS))
+def test_batch_matches_game(name, shape):
+    rules = VARIANTS[name]
+    for seed in range(3):
+        flaps = [set(flaps_of(rules, shape, seed, noise)) for noise in range(BIRDS)]
+        game = batch.BatchGame(BIRDS, random.Random(seed), shape, rules=rules)
+        while game.frame < FRAMES:
+            actions = np.array([game.frame in bird for bird in flaps])
+            if not game.step(actions):
+                break
+        for i, bird in enumerate(flaps):
+            expected = stepped(rules, shape, seed, bird)
+            assert game.frames[i] == expected.frame
+            assert game.score[i] == expected.score
+            assert batch.DEATH_CAUSES[game.death_cause[i]] == expected.death_cause
+            assert game.y[i] == expected.bird.y
+            assert game.velocity[i] == expected.bird.velocity
@@ -0,0 +1,73 @@
+import pickle
+import random
+
+import pygame
+import pytest
+
+from flappy_engine.core import (BIRD_SHAPES, RULES, WINDOW_HEIGHT, WINDOW_WIDTH, Game, Rules,
+                                scroll)
+from flappy_engine.courses import Course
+from flappy_engine.render import paint_game
+from flappy_engine.variants import VARIANTS
+
+from conftest import FRAMES, flaps_of, state
+
+
+def swept_by_frame(rules, shape, seed, flaps):
+    game = Game(random.Random(seed), shape, rules=rules, swept=True)
+    flaps = set(flaps)
+    while game.frame < FRAMES and game.advance(1, game.frame in flaps):
+        pass
+    return game
+
+
+@pytest.mark.parametrize('shape', BIRD_SHAPES)
+@pytest.mark.parametrize('name', sorted(VARIANTS))
+def test_swept_advance_matches_single_frames(name, shape):
+    rules = VARIANTS[name]
+    for seed in range(8):
+        flaps = flaps_of(rules, shape, seed)
+        game = Game(random.Random(seed), shape, rules=rules, swept=True)
+        # One advance() from each flap to the next, the last one to FRAMES
+        starts = [0] + flaps if not flaps or flaps[0] else flaps
+        for start, stop in zip(starts, starts[1:] + [FRAMES]):
+            if not game.advance(stop - start, start in flaps):
+                break
+        assert state(game) == state(swept_by_frame(rules, shape, seed, flaps))
+
+
+
+def test_default_rules_are_recognized_by_value():
+    course = Course()
+    for rules in (Rules(), pickle.loads(pickle.dumps(RULES))):
+        assert rules == RULES and rules is not RULES
+        game = Game(random.Random(0), course=course, rules=rules)
+        paint_game(pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)), game)
+    with pytest.raises(ValueError):
+        Game(random.Random(0), course=course, rules=VARIANTS['deepseek'])
+
+
+@pytest.mark.parametrize('name', sorted(VARIANTS))
+def test_course_keeps_the_rng_in_step(name):
+    rules = VARIANTS[name]
+    course = Course(rules=rules)
+    games = [Game(random.Random(0), rules=rules),
+             Game(random.Random(0), course=course, rules=rules)]
+    other = VARIANTS['claude3.5' if name != 'claude3.5' else 'deepseek']
+    with pytest.raises(ValueError):
+        Game(random.Random(0), course=course, rules=other)
+    # Scroll the pipes on their own, so no bird has to survive them
+    spawned = 0
+    for _ in range(20000):
+        for game in games:
+            game.frame += 1
+            scroll(game)
+        assert games[0].rng.getstate() == games[1].rng.getstate()
+        if not games[1].pipes:
+            continue
+        plain, coursed = (game.pipes[-1] for game in games)
+        if coursed.x == rules.spawn_x - rules.physics.pipe_speed:
+            spawned += 1
+            assert coursed.height in course.analysis.heights
+            assert coursed.color == plain.color
+    assert spawned > 100 and course.repaired < spawned
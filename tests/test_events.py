@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from flappy_engine.core import BIRD_SHAPES, Game
+from flappy_engine.events import exact, play
+from flappy_engine.variants import VARIANTS
+
+from conftest import FRAMES, flaps_of, state, stepped
+
+
+@pytest.mark.parametrize('shape', BIRD_SHAPES)
+@pytest.mark.parametrize('name', sorted(VARIANTS))
+def test_play_matches_step(name, shape):
+    rules = VARIANTS[name]
+    for seed in range(8):
+        flaps = flaps_of(rules, shape, seed)
+        game = Game(random.Random(seed), shape, rules=rules)
+        assert exact(game)
+        play(game, flaps, FRAMES)
+        assert state(game) == state(stepped(rules, shape, seed, flaps))
+
+
+@pytest.mark.parametrize('name', sorted(VARIANTS))
+def test_play_resumes_where_it_stopped(name):
+    rules = VARIANTS[name]
+    flaps = flaps_of(rules, 'square', 0)
+    game = Game(random.Random(0), rules=rules)
+    # Stop a few frames after each of the first flaps, then carry on
+    for flap in flaps[:20]:
+        stop = flap + 3
+        play(game, [frame - game.frame for frame in flaps if frame >= game.frame],
+             stop - game.frame)
+        assert state(game) == state(stepped(rules, 'square', 0, flaps, stop))
@@ -0,0 +1,80 @@
+import random
+
+import pygame
+import pytest
+
+from flappy_engine.controllers import gap_follower
+from flappy_engine.core import (BACKGROUND_COLOR, BIRD_COLOR, BIRD_SHAPES, GROUND_COLOR,
+                                GROUND_Y, WINDOW_HEIGHT, WINDOW_WIDTH, Game)
+from flappy_engine.render import paint_game
+from flappy_engine.sprites import bird_sprite
+
+
+def draw_reference(game):
+    """The scene as GameView draws it, with pygame.draw and the bird sprite."""
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    surface.fill(BACKGROUND_COLOR)
+    for pipe in game.pipes:
+        pygame.draw.rect(surface, pipe.color,
+                         (pipe.x - 30, pipe.height, 60, WINDOW_HEIGHT - pipe.height))
+        pygame.draw.rect(surface, pipe.color, (pipe.x - 30, 0, 60, pipe.height - pipe.gap))
+    image, _ = bird_sprite(game.bird.shape, BIRD_COLOR)
+    surface.blit(image, game.bird.get_rect())
+    pygame.draw.rect(surface, GROUND_COLOR,
+                     (0, GROUND_Y, WINDOW_WIDTH, WINDOW_HEIGHT - GROUND_Y))
+    return surface
+
+
+def painted(game):
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    paint_game(surface, game)
+    return surface
+
+
+def scenes(shape):
+    """Frames of a played game, then the same course with the bird at the top."""
+    game = Game(random.Random(7), shape)
+    for frame in range(900):
+        if not game.step(gap_follower(game)):
+            game.reset()
+        # Every frame once pipes reach the left edge, a sample before
+        if frame % 10 == 0 or any(pipe.x < 30 for pipe in game.pipes):
+            yield game
+    for y in (-20, -5, 0, 3):
+        game.bird.y = y
+        yield game
+
+
+def edge_cases_seen(shape):
+    left = top = False
+    for game in scenes(shape):
+        left = left or any(-30 < pipe.x < 30 for pipe in game.pipes)
+        top = top or game.bird.get_rect()[1] < 0
+    return left and top
+
+
+@pytest.mark.parametrize('shape', BIRD_SHAPES)
+def test_paint_game_matches_pygame_draw(shape):
+    assert edge_cases_seen(shape)
+    for game in scenes(shape):
+        expected = pygame.image.tobytes(draw_reference(game), 'RGB')
+        assert pygame.image.tobytes(painted(game), 'RGB') == expected, game.frame
+
+
+@pytest.mark.parametrize('shape', BIRD_SHAPES)
+def test_rasterizer_matches_paint_game(shape):
+    np = pytest.importorskip('numpy')
+    from flappy_engine.raster import Rasterizer, box_weights
+
+    width, height = 84, 84
+    rasterizer = Rasterizer(width, height)
+    columns = box_weights(WINDOW_WIDTH, width)
+    rows = box_weights(WINDOW_HEIGHT, height)
+    columns = columns[1:] - columns[:-1]
+    rows = rows[1:] - rows[:-1]
+    for game in scenes(shape):
+        rgb = pygame.surfarray.array3d(painted(game)).astype(float)
+        gray = rgb @ np.array([0.299, 0.587, 0.114])
+        expected = rows.T @ gray.T @ columns
+        frame = rasterizer.render([game])[0]
+        assert np.abs(frame - expected).max() <= 0.51, game.frame
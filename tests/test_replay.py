@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from flappy_engine import replay as replays
+from flappy_engine.controllers import gap_follower
+from flappy_engine.core import PHYSICS, Game
+from flappy_engine.replay import Replay, ReplayError, verify
+
+
+def recorded(seed=3):
+    game = Game(random.Random(seed))
+    replay = Replay(seed, game.bird.shape, PHYSICS)
+    while game.game_active:
+        flap = gap_follower(game) and game.frame % 7 != 0
+        replay.record(flap)
+        game.step(flap)
+    replay.score = game.score
+    return replay
+
+
+def test_verify_accepts_a_recorded_game():
+    replay = Replay.from_bytes(recorded().to_bytes())
+    assert replay.score > 0
+    assert verify(replay)
+
+
+def test_verify_rejects_a_claimed_score():
+    replay = recorded()
+    replay.score += 1
+    assert not verify(replay)
+
+
+def test_verify_rejects_other_physics():
+    replay = recorded()
+    replay.physics = PHYSICS._replace(pipe_gap=450)
+    with pytest.raises(ReplayError):
+        verify(Replay.from_bytes(replay.to_bytes()))
+
+
+@pytest.mark.parametrize('physics', [PHYSICS._replace(pipe_speed=0),
+                                     PHYSICS._replace(gravity=0),
+                                     PHYSICS._replace(gravity=float('nan')),
+                                     PHYSICS._replace(pipe_gap=-150)])
+def test_load_rejects_impossible_physics(physics):
+    replay = recorded()
+    replay.physics = physics
+    with pytest.raises(ReplayError):
+        Replay.from_bytes(replay.to_bytes())
+
+
+def test_verify_command_carries_on_past_bad_files(tmp_path, capsys):
+    good = recorded()
+    bad = recorded()
+    bad.physics = PHYSICS._replace(pipe_speed=0)
+    good.save(tmp_path / 'good.flrp')
+    bad.save(tmp_path / 'bad.flrp')
+    with pytest.raises(SystemExit) as exit:
+        replays.main(['verify', str(tmp_path / 'bad.flrp'), str(tmp_path / 'good.flrp')])
+    assert exit.value.code == 1
+    out = capsys.readouterr().out
+    assert 'bad.flrp: error' in out
+    assert 'good.flrp: ok' in out
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from flappy_engine.core import BIRD_SHAPES, Game
+from flappy_engine.events import play
+from flappy_engine.solver import Solver, Unsolvable, course_heights, solve
+
+PIPES = 30
+
+
+@pytest.mark.parametrize('shape', BIRD_SHAPES)
+def test_solution_gets_through_in_the_engine(shape):
+    for seed in range(3):
+        solution = solve(course_heights(seed, PIPES), shape)
+        assert solution.flaps == sum(solution.actions)
+        game = Game(random.Random(seed), shape)
+        play(game, [frame for frame, action in enumerate(solution.actions) if action],
+             len(solution.actions))
+        assert game.game_active and game.score == PIPES
+
+
+def test_every_flap_is_needed():
+    heights = course_heights(0, 5)
+    solution = solve(heights)
+    for skipped in [frame for frame, action in enumerate(solution.actions) if action]:
+        game = Game(random.Random(0))
+        play(game, [frame for frame, action in enumerate(solution.actions)
+                    if action and frame != skipped], len(solution.actions))
+        assert game.score < len(heights) or not game.game_active
+
+
+def test_impossible_course_is_reported():
+    with pytest.raises(Unsolvable):
+        # A 30 pixel bird cannot keep 61 pixels clear of both lips of a 150 pixel gap
+        Solver(course_heights(0, 5), margin=61).solve()